@@ -1,119 +1,215 @@
 import os
-import cloudinary
 import logging
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from flask_migrate import Migrate
-from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.sql import text
 from flask_jwt_extended import JWTManager
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from app.utils.response_cache import ResponseCache
 from sqlalchemy.exc import OperationalError
-import time
-
-# Load environment variables
-load_dotenv()
-
-# Enable debug logging globally
-logging.basicConfig(level=logging.DEBUG)
-
-# Initialize Flask app
-app = Flask(__name__)
-
-# Database configuration using environment variables
-app.config["SQLALCHEMY_DATABASE_URI"] = (
-    f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
-    f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
-)
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY")
-
-# Retry logic for database connection
-def retry_on_operational_error(func, retries=3, delay=5):
-    for attempt in range(retries):
-        try:
-            return func()
-        except OperationalError as e:
-            if attempt < retries - 1:
-                print(f"Retrying database connection... (Attempt {attempt + 1})")
-                time.sleep(delay)
-            else:
-                print("Max retries reached. Could not connect to the database.")
-                raise e
-
-# Create the SQLAlchemy engine with retry logic
-engine = retry_on_operational_error(
-    lambda: create_engine(
-        app.config["SQLALCHEMY_DATABASE_URI"],
-        pool_size=5,  # Initial pool size
-        max_overflow=10,  # Allow up to 10 additional connections
-        pool_timeout=30,  # Timeout for acquiring a connection
-        pool_recycle=900,  # Recycle connections after 15 minutes
+from app.utils.monitoring import InstrumentedQueuePool, pool_metrics, monitor
+from app.utils.passwords import HasherBusy, password_hasher
+from app.utils.rate_limit import RateLimiter
+from app.utils.json_provider import init_json
+from app.utils.compression import compressor
+
+# Extensions are created unbound and attached to the app in create_app(), so
+# models and routes can import them without building an app first
+db = SQLAlchemy()
+migrate = Migrate()
+jwt = JWTManager()
+response_cache = ResponseCache()
+rate_limiter = RateLimiter()
+
+def load_config(app):
+    """Read the app's configuration from the environment."""
+    # Database configuration using environment variables (DATABASE_URL, e.g. a local
+    # SQLite file for benchmarks, takes precedence over the DB_* settings)
+    app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL") or (
+        f"postgresql://{os.getenv('DB_USER')}:{os.getenv('DB_PASSWORD')}"
+        f"@{os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}/{os.getenv('DB_NAME')}"
+    )
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY")
+
+    # Connection pool sizing and statement timeout (see configure_engine)
+    app.config["WEB_CONCURRENCY"] = int(os.getenv("WEB_CONCURRENCY", 1))
+    app.config["GUNICORN_THREADS"] = int(os.getenv("GUNICORN_THREADS", 1))
+    app.config["DB_POOL_SIZE"] = int(os.getenv("DB_POOL_SIZE", app.config["GUNICORN_THREADS"] + 4))
+    app.config["DB_MAX_CONNECTIONS"] = int(os.getenv("DB_MAX_CONNECTIONS", 20))
+    app.config["DB_STATEMENT_TIMEOUT_MS"] = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 30000))
+
+    # Timezone of the naive event date_time values, used to tell upcoming from past events
+    app.config["EVENT_TIMEZONE"] = os.getenv("EVENT_TIMEZONE", "Africa/Nairobi")
+
+    # Public response cache (in-process by default, shared when REDIS_URL is set)
+    app.config["RESPONSE_CACHE_TTL"] = int(os.getenv("RESPONSE_CACHE_TTL", 300))
+    app.config["REDIS_URL"] = os.getenv("REDIS_URL")
+
+    # Throttling of login and password reset (shared across workers when REDIS_URL is set).
+    # Behind a reverse proxy (Render: 1) RATE_LIMIT_PROXY_HOPS must count it, or every
+    # client shares the proxy's address and its limits
+    app.config["RATE_LIMIT_ENABLED"] = os.getenv("RATE_LIMIT_ENABLED", "true").lower() != "false"
+    app.config["RATE_LIMIT_PROXY_HOPS"] = int(os.getenv("RATE_LIMIT_PROXY_HOPS", 0))
+
+    # gzip/brotli compression of JSON and text responses of at least COMPRESS_MIN_SIZE bytes
+    app.config["COMPRESS_ENABLED"] = os.getenv("COMPRESS_ENABLED", "true").lower() != "false"
+    app.config["COMPRESS_MIN_SIZE"] = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+
+    # Requests slower than this (or with more SQL statements than QUERY_WARN_COUNT) are logged
+    app.config["SLOW_REQUEST_MS"] = int(os.getenv("SLOW_REQUEST_MS", 1000))
+    app.config["QUERY_WARN_COUNT"] = int(os.getenv("QUERY_WARN_COUNT", 30))
+    # /metrics and /db_stats need an admin login, or this bearer token for a scraper
+    app.config["METRICS_TOKEN"] = os.getenv("METRICS_TOKEN")
+
+    # Password hashing runs in a small per-worker process pool (see utils.passwords); every
+    # gunicorn worker starts its own, so keep PASSWORD_HASH_WORKERS low on small instances
+    app.config["PASSWORD_SCHEME"] = os.getenv("PASSWORD_SCHEME", "bcrypt")
+    app.config["BCRYPT_LOG_ROUNDS"] = int(os.getenv("BCRYPT_LOG_ROUNDS", 12))
+    app.config["PASSWORD_HASH_WORKERS"] = int(os.getenv("PASSWORD_HASH_WORKERS", 1))
+
+    # Cloudinary credentials, applied when the SDK is first used (see utils.upload_queue)
+    app.config["CLOUDINARY_CLOUD_NAME"] = os.getenv("CLOUDINARY_CLOUD_NAME")
+    app.config["CLOUDINARY_API_KEY"] = os.getenv("CLOUDINARY_API_KEY")
+    app.config["CLOUDINARY_API_SECRET"] = os.getenv("CLOUDINARY_API_SECRET")
+
+    # JSON encoding: "orjson" (the default when it is installed) or Flask's "default"
+    app.config["JSON_PROVIDER"] = os.getenv("JSON_PROVIDER")
+
+    # Additional configurations
+    app.config["BREVO_API_KEY"] = os.getenv("BREVO_API_KEY")
+    app.config["BREVO_SENDER_EMAIL"] = os.getenv("BREVO_SENDER_EMAIL")
+    app.config["BREVO_API_HOST"] = os.getenv("BREVO_API_HOST")  # Override to point at a local fake Brevo
+
+def configure_engine(app):
+    """Derive the engine options from the final config, once overrides have been applied."""
+    if "SQLALCHEMY_ENGINE_OPTIONS" in app.config:
+        return
+    uri = app.config["SQLALCHEMY_DATABASE_URI"]
+    if uri in ("sqlite://", "sqlite:///:memory:"):
+        return  # Flask-SQLAlchemy shares one connection for an in-memory database
+
+    # Connection pool: each gunicorn worker process owns one pool, sized for its request
+    # threads plus background upload threads. Overflow is capped so that all workers
+    # together stay within the database's connection budget. The engine connects on
+    # first use, never at startup.
+    db_pool_size = app.config["DB_POOL_SIZE"]
+    options = {
+        "poolclass": InstrumentedQueuePool,
+        "pool_size": db_pool_size,
+        "max_overflow": max(0, app.config["DB_MAX_CONNECTIONS"] // app.config["WEB_CONCURRENCY"] - db_pool_size),
+        "pool_timeout": 30,  # Timeout for acquiring a connection
+        "pool_recycle": 900,  # Recycle connections after 15 minutes
+        "pool_pre_ping": True,  # Replace connections dropped by the server before use
+    }
+    if uri.startswith("postgresql"):
+        options["connect_args"] = {"options": f"-c statement_timeout={app.config['DB_STATEMENT_TIMEOUT_MS']}"}
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = options
+
+def register_blueprints(app):
+    # Route modules (and the models they use) are only imported once an app is built
+    from app.routes import (
+        user_routes,
+        event_routes,
+        participant_routes,
+        gallery_routes,
+        video_routes,
+        stat_routes,
+        newsletter_routes,
+        sys_images_routes,
+        upload_routes,
     )
-)
-
-# Check the number of active connections (optional for debugging)
-@app.route("/db_stats", methods=["GET"])
-def db_stats():
-    """Return the number of active database connections."""
-    with engine.connect() as connection:
-        result = connection.execute(text("SELECT COUNT(*) FROM pg_stat_activity"))
-        return {"active_connections": result.scalar()}
-
-# Create a scoped session
-Session = scoped_session(sessionmaker(bind=engine))
-
-@app.teardown_appcontext
-def shutdown_session(exception=None):
-    """Ensure database sessions are properly closed after each request."""
-    Session.remove()
-
-# Global error handler for OperationalError
-@app.errorhandler(OperationalError)
-def handle_operational_error(e):
-    """Handle database connection errors gracefully."""
-    return {"error": "Database connection error. Please try again later."}, 500
-
-# Initialize extensions
-db = SQLAlchemy(app)
-migrate = Migrate(app, db)
-jwt = JWTManager(app)
-CORS(app, resources={r"/api/*": {
-    "origins": ["http://localhost:3000", 
-                "https://kamaruchallenge.africa"],
-                "supports_credentials": True
-                }})
-
-# Configure Cloudinary using CLOUDINARY_URL from .env
-cloudinary.config(
-    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
-    api_key=os.getenv("CLOUDINARY_API_KEY"),
-    api_secret=os.getenv("CLOUDINARY_API_SECRET")
-)
-
-# Additional configurations
-app.config["BREVO_API_KEY"] = os.getenv("BREVO_API_KEY")
-app.config["BREVO_SENDER_EMAIL"] = os.getenv("BREVO_SENDER_EMAIL")
-
-# Import and register routes
-from app.routes import (
-    user_routes,
-    event_routes,
-    participant_routes,
-    gallery_routes,
-    video_routes,
-    stat_routes,
-    newsletter_routes,
-    sys_images_routes,
-)
-
-app.register_blueprint(user_routes.bp, url_prefix="/api/users")
-app.register_blueprint(event_routes.bp, url_prefix="/api/events", strict_slashes=False)
-app.register_blueprint(stat_routes.bp, url_prefix="/api/stats")
-app.register_blueprint(newsletter_routes.bp, url_prefix="/api")
-app.register_blueprint(participant_routes.bp, url_prefix="/api/participants")
-app.register_blueprint(gallery_routes.bp, url_prefix="/api/gallery")
-app.register_blueprint(sys_images_routes.bp, url_prefix="/api/sys_images")
-app.register_blueprint(video_routes.bp, url_prefix="/api/videos")
+
+    app.register_blueprint(user_routes.bp, url_prefix="/api/users")
+    app.register_blueprint(event_routes.bp, url_prefix="/api/events", strict_slashes=False)
+    app.register_blueprint(stat_routes.bp, url_prefix="/api/stats")
+    app.register_blueprint(newsletter_routes.bp, url_prefix="/api")
+    app.register_blueprint(participant_routes.bp, url_prefix="/api/participants")
+    app.register_blueprint(gallery_routes.bp, url_prefix="/api/gallery")
+    app.register_blueprint(sys_images_routes.bp, url_prefix="/api/sys_images")
+    app.register_blueprint(video_routes.bp, url_prefix="/api/videos")
+    app.register_blueprint(upload_routes.bp, url_prefix="/api/uploads")
+
+def create_app(config=None):
+    """Build and configure the Flask app. `config` overrides values read from the environment."""
+    # Load environment variables
+    load_dotenv()
+
+    # Enable debug logging globally
+    logging.basicConfig(level=logging.DEBUG)
+
+    # Initialize Flask app
+    app = Flask(__name__)
+    load_config(app)
+    app.config.update(config or {})
+    configure_engine(app)
+    init_json(app)
+
+    # Global error handler for OperationalError
+    @app.errorhandler(OperationalError)
+    def handle_operational_error(e):
+        """Handle database connection errors gracefully."""
+        return {"error": "Database connection error. Please try again later."}, 500
+
+    # Too many password hashes queued in this worker: ask the client to retry shortly
+    @app.errorhandler(HasherBusy)
+    def handle_hasher_busy(e):
+        return {"error": "Server is busy. Please try again shortly."}, 503, {"Retry-After": "1"}
+
+    # Initialize extensions
+    db.init_app(app)
+    migrate.init_app(app, db)
+    jwt.init_app(app)
+    response_cache.init_app(app)
+    rate_limiter.init_app(app)
+    monitor.init_app(app)
+    password_hasher.init_app(app)
+    compressor.init_app(app)
+    CORS(app, resources={r"/api/*": {
+        "origins": ["http://localhost:3000",
+                    "https://kamaruchallenge.africa"],
+                    "supports_credentials": True,
+                    # Pagination headers of the participant listing, readable by the dashboard
+                    "expose_headers": ["X-Total-Count", "X-Next-After-Id"],
+                    }})
+
+    # Check the database connections and pool usage (optional for debugging)
+    from app.utils.decorators import metrics_access_required
+
+    @app.route("/db_stats", methods=["GET"])
+    @metrics_access_required
+    def db_stats():
+        """Return connection pool statistics and the number of active database connections."""
+        pool = db.engine.pool
+        stats = {"pool": pool_metrics.snapshot()}
+        if isinstance(pool, QueuePool):
+            stats["pool"].update(
+                size=pool.size(),
+                checked_out=pool.checkedout(),
+                idle=pool.checkedin(),
+                overflow=pool.overflow(),
+            )
+
+        if db.engine.dialect.name == "postgresql":
+            with db.engine.connect() as connection:
+                result = connection.execute(
+                    text("SELECT COUNT(*) FROM pg_stat_activity WHERE datname = current_database()")
+                )
+                stats["active_connections"] = result.scalar()
+        return stats
+
+    # CLI: `flask upgrade-schema` adds tables, columns and indexes the models have gained
+    @app.cli.command("upgrade-schema")
+    def upgrade_schema_command():
+        """Create missing tables, columns and indexes; existing ones are left untouched."""
+        from app.utils.schema import upgrade_schema
+        changes = upgrade_schema()
+        for change in changes:
+            print(change)
+        print(f"Schema is up to date ({len(changes)} change(s))")
+
+    register_blueprints(app)
+    return app
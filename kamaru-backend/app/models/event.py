@@ -2,6 +2,12 @@ from app import db
 from datetime import datetime, timezone
 
 class Event(db.Model):
+    # Serves the upcoming/past listings and their (date_time, id) cursors
+    __table_args__ = (db.Index("ix_event_date_time_id", "date_time", "id"),)
+
+    # Columns for list cards (?view=summary); skips the long details body
+    SUMMARY_FIELDS = ["id", "title", "theme", "date_time", "location", "image_url", "image_srcset"]
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     theme = db.Column(db.String(255), nullable=False)
@@ -9,6 +15,10 @@ class Event(db.Model):
     date_time = db.Column(db.DateTime, nullable=False)
     location = db.Column(db.String(255), nullable=False)
     image_url = db.Column(db.String(500), nullable=False)  # Cloudinary URL
+    image_width = db.Column(db.Integer)  # Original dimensions, when known
+    image_height = db.Column(db.Integer)
+    image_variants = db.Column(db.JSON)  # thumbnail/medium/large: {url, width, height}
+    image_srcset = db.Column(db.Text)  # Ready for <img srcset>
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
 
     def to_dict(self):
@@ -20,5 +30,9 @@ class Event(db.Model):
             "date_time": self.date_time.strftime("%Y-%m-%d %H:%M:%S"),
             "location": self.location,
             "image_url": self.image_url,
+            "image_width": self.image_width,
+            "image_height": self.image_height,
+            "image_variants": self.image_variants,
+            "image_srcset": self.image_srcset,
             "created_at": self.created_at.strftime("%Y-%m-%d %H:%M:%S"),
         }
\ No newline at end of file
@@ -3,9 +3,19 @@ from datetime import datetime, timezone
 
 # Gallery model
 class Gallery(db.Model):
+    # Supports the public feed's keyset pagination on (uploaded_at, id)
+    __table_args__ = (db.Index("ix_gallery_uploaded_at_id", "uploaded_at", "id"),)
+
+    # Columns for list views (?view=summary)
+    SUMMARY_FIELDS = ["id", "title", "image_url", "image_srcset"]
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     image_url = db.Column(db.String(500), nullable=False)  # Cloudinary URL
+    image_width = db.Column(db.Integer)  # Original dimensions, when known
+    image_height = db.Column(db.Integer)
+    image_variants = db.Column(db.JSON)  # thumbnail/medium/large: {url, width, height}
+    image_srcset = db.Column(db.Text)  # Ready for <img srcset>
     uploaded_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))  # Timezone-aware datetime
 
     def to_dict(self):  # Convert the model to a dictionary
@@ -13,5 +23,9 @@ class Gallery(db.Model):
             "id": self.id,
             "title": self.title,
             "image_url": self.image_url,  # Cloudinary URL
+            "image_width": self.image_width,
+            "image_height": self.image_height,
+            "image_variants": self.image_variants,
+            "image_srcset": self.image_srcset,
             "uploaded_at": self.uploaded_at.strftime("%Y-%m-%d %H:%M:%S"),
         }
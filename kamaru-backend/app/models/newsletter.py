@@ -7,4 +7,45 @@ class NewsletterSubscriber(db.Model):
     subscribed_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     def to_dict(self):
-        return {"id": self.id, "email": self.email, "subscribed_at": self.subscribed_at}
\ No newline at end of file
+        return {"id": self.id, "email": self.email, "subscribed_at": self.subscribed_at}
+
+# A NewsletterCampaign is one email sent to every subscriber. Sending is tracked
+# per recipient in CampaignDelivery so an interrupted fan-out can resume.
+class NewsletterCampaign(db.Model):
+    __tablename__ = "newsletter_campaigns"
+
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(255), nullable=False)
+    html_content = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="draft")  # draft, sending, sent
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)  # Refreshed by the sender while it runs
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "subject": self.subject,
+            "status": self.status,
+            "created_at": self.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "started_at": self.started_at.strftime("%Y-%m-%d %H:%M:%S") if self.started_at else None,
+            "finished_at": self.finished_at.strftime("%Y-%m-%d %H:%M:%S") if self.finished_at else None,
+        }
+
+
+class CampaignDelivery(db.Model):
+    __tablename__ = "campaign_deliveries"
+    __table_args__ = (
+        db.UniqueConstraint("campaign_id", "subscriber_id", name="uq_campaign_deliveries_campaign_subscriber"),
+        db.Index("ix_campaign_deliveries_campaign_status", "campaign_id", "status", "id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    campaign_id = db.Column(db.Integer, db.ForeignKey("newsletter_campaigns.id", ondelete="CASCADE"), nullable=False)
+    subscriber_id = db.Column(db.Integer, nullable=False)
+    email = db.Column(db.String(255), nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, sent, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0, server_default="0")  # Runs that tried to send it
+    error = db.Column(db.Text, nullable=True)
+    sent_at = db.Column(db.DateTime, nullable=True)
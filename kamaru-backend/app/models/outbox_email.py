@@ -0,0 +1,32 @@
+from app import db
+from datetime import datetime
+
+# OutboxEmail is a queued outbound email. Routes insert rows and return
+# immediately; the background sender in utils.email_service delivers them.
+class OutboxEmail(db.Model):
+    __tablename__ = "outbox_emails"
+    __table_args__ = (db.Index("ix_outbox_emails_status_next_attempt_at", "status", "next_attempt_at"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    to_email = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    html_content = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), nullable=False, default="pending")  # pending, sending, sent, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    claimed_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "to_email": self.to_email,
+            "subject": self.subject,
+            "status": self.status,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "created_at": self.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "sent_at": self.sent_at.strftime("%Y-%m-%d %H:%M:%S") if self.sent_at else None,
+        }
@@ -2,12 +2,15 @@ from app import db
 
 # 
 class Participant(db.Model):
+    # Columns for list views (?view=summary)
+    SUMMARY_FIELDS = ["id", "name", "category", "registered_at"]
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     phone = db.Column(db.String(20), unique=True, nullable=False)
-    category = db.Column(db.String(50), nullable=False)
-    registered_at = db.Column(db.DateTime, default=db.func.current_timestamp())
+    category = db.Column(db.String(50), nullable=False, index=True)
+    registered_at = db.Column(db.DateTime, default=db.func.current_timestamp(), index=True)
 
     def to_dict(self):
         return {
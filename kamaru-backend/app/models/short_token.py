@@ -1,23 +1,63 @@
-import random
+import secrets
 import string
 from app import db
 from datetime import datetime, timedelta
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+
+TOKEN_ALPHABET = string.ascii_letters + string.digits
+TOKEN_LIFETIME = timedelta(minutes=15)
+GENERATE_ATTEMPTS = 5  # Retries if a random token collides with an existing one
+SWEEP_BATCH_SIZE = 1000
 
 class ShortToken(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     short_token = db.Column(db.String(6), unique=True, nullable=False)
-    expires_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.utcnow() + timedelta(minutes=15))
+    expires_at = db.Column(db.DateTime, nullable=False, default=lambda: datetime.utcnow() + TOKEN_LIFETIME, index=True)
 
     @staticmethod
     def generate_token(user_id):
-        """Generates a short token and saves it."""
-        token = ''.join(random.choices(string.ascii_letters + string.digits, k=6))
-        expires_at = datetime.utcnow() + timedelta(minutes=15)
+        """Generates a short token and saves it, retrying on the rare collision."""
+        for attempt in range(GENERATE_ATTEMPTS):
+            token = ''.join(secrets.choice(TOKEN_ALPHABET) for _ in range(6))
+            short_token_entry = ShortToken(user_id=user_id, short_token=token, expires_at=datetime.utcnow() + TOKEN_LIFETIME)
+            try:
+                # A savepoint keeps the rest of the transaction if the unique constraint fires
+                with db.session.begin_nested():
+                    db.session.add(short_token_entry)
+            except IntegrityError:
+                if attempt == GENERATE_ATTEMPTS - 1:
+                    raise
+                continue
+            db.session.commit()
+            return token
+
+    @staticmethod
+    def consume(token):
+        """Delete an unexpired token and return its user_id, or None if it is unknown or expired.
 
-        # Store the token in the database
-        short_token_entry = ShortToken(user_id=user_id, short_token=token, expires_at=expires_at)
-        db.session.add(short_token_entry)
-        db.session.commit()
+        One DELETE ... RETURNING, so a code can only ever be used once.
+        """
+        return db.session.execute(
+            delete(ShortToken)
+            .where(ShortToken.short_token == token, ShortToken.expires_at > datetime.utcnow())
+            .returning(ShortToken.user_id)
+        ).scalar()
 
-        return token
+    @staticmethod
+    def delete_expired(batch_size=SWEEP_BATCH_SIZE):
+        """Delete expired tokens in batches, committing after each. Returns how many were removed."""
+        removed = 0
+        while True:
+            expired = (
+                select(ShortToken.id)
+                .where(ShortToken.expires_at <= datetime.utcnow())
+                .limit(batch_size)
+                .scalar_subquery()
+            )
+            deleted = db.session.execute(delete(ShortToken).where(ShortToken.id.in_(expired))).rowcount
+            db.session.commit()
+            removed += deleted
+            if deleted < batch_size:
+                return removed
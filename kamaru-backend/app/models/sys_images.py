@@ -7,6 +7,10 @@ class SystemImage(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     section = db.Column(db.String(255), nullable=False)  # Section name
     image_url = db.Column(db.String(500), nullable=False)  # Cloudinary URL
+    image_width = db.Column(db.Integer)  # Original dimensions, when known
+    image_height = db.Column(db.Integer)
+    image_variants = db.Column(db.JSON)  # thumbnail/medium/large: {url, width, height}
+    image_srcset = db.Column(db.Text)  # Ready for <img srcset>
     uploaded_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))  # Timestamp
 
     def to_dict(self):
@@ -14,5 +18,9 @@ class SystemImage(db.Model):
             "id": self.id,
             "section": self.section,
             "image_url": self.image_url,
+            "image_width": self.image_width,
+            "image_height": self.image_height,
+            "image_variants": self.image_variants,
+            "image_srcset": self.image_srcset,
             "uploaded_at": self.uploaded_at.strftime("%Y-%m-%d %H:%M:%S"),
         }
\ No newline at end of file
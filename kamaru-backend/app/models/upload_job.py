@@ -0,0 +1,33 @@
+from app import db
+from datetime import datetime, timezone
+
+# An UploadJob tracks one image handed off to the background uploader.
+# The file is spooled to local disk, uploaded to Cloudinary by a worker
+# thread, and the resulting URL is then applied according to `kind`.
+class UploadJob(db.Model):
+    __tablename__ = "upload_jobs"
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(50), nullable=False)  # event, gallery, system_image
+    target_id = db.Column(db.Integer, nullable=True)  # Row to patch, or the row created on completion
+    payload = db.Column(db.JSON, nullable=False, default=dict)  # Fields needed to apply the result
+    file_path = db.Column(db.String(500), nullable=False)  # Spooled local copy of the upload
+    status = db.Column(db.String(20), nullable=False, default="pending", index=True)  # pending, running, done, failed
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    error = db.Column(db.Text, nullable=True)
+    result_url = db.Column(db.String(500), nullable=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def to_dict(self):
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "target_id": self.target_id,
+            "status": self.status,
+            "attempts": self.attempts,
+            "error": self.error,
+            "result_url": self.result_url,
+            "created_at": self.created_at.strftime("%Y-%m-%d %H:%M:%S"),
+            "updated_at": self.updated_at.strftime("%Y-%m-%d %H:%M:%S"),
+        }
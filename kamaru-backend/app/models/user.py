@@ -1,7 +1,5 @@
 from app import db
-from flask_bcrypt import Bcrypt
-
-bcrypt = Bcrypt()
+from app.utils.passwords import password_hasher
 
 # User model
 class User(db.Model):
@@ -13,11 +11,14 @@ class User(db.Model):
 
     def set_password(self, password):
         """Hash and set user password."""
-        self.password_hash = bcrypt.generate_password_hash(password).decode("utf-8")
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        """Check if password matches hashed password."""
-        return bcrypt.check_password_hash(self.password_hash, password)
+        """Check if password matches hashed password, upgrading hashes made with old parameters."""
+        valid, new_hash = password_hasher.verify(self.password_hash, password)
+        if new_hash:
+            self.password_hash = new_hash
+        return valid
 
     def to_dict(self):
         """Return user object as dictionary."""
@@ -7,6 +7,9 @@ from app import db
 # - uploaded_at: the timestamp when the video was uploaded
 # The Video model also has a to_dict method that converts the model to a dictionary for JSON serialization.
 class Video(db.Model):
+    # Columns for list views (?view=summary)
+    SUMMARY_FIELDS = ["id", "title", "youtube_url"]
+
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(255), nullable=False)
     youtube_url = db.Column(db.String(500), nullable=False, unique=True)
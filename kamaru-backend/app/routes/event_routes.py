@@ -1,62 +1,166 @@
-from flask import Blueprint, request, jsonify
-from app import db
+from flask import Blueprint, current_app, request, jsonify
+from app import db, response_cache
 from app.models.event import Event
-from app.models.user import User  # Import the User model
-import cloudinary.uploader
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.utils.decorators import admin_required
+from app.utils.image_variants import uploaded_image_fields
+from app.utils.projection import project, requested_fields, row_serializer
+from app.utils.upload_queue import enqueue_upload, upload_handler
+from flask_jwt_extended import jwt_required
+from sqlalchemy import func, tuple_
 from datetime import datetime
+from zoneinfo import ZoneInfo
 
 bp = Blueprint("event_routes", __name__)
 
-# Helper function to check if the user is an admin
-def is_admin():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    return user and user.is_admin
+EVENT_FIELDS = ["title", "theme", "details", "date_time", "location"]
+
+# Listing modes and page sizes
+EVENT_MODES = ["upcoming", "past"]
+DEFAULT_EVENT_PAGE_SIZE = 10
+MAX_EVENT_PAGE_SIZE = 100
+
+# Helper function for the current wall-clock time in the events' timezone. Event.date_time
+# is stored naive, as entered in the admin's datetime-local field, so "now" must be too.
+def event_now():
+    return datetime.now(ZoneInfo(current_app.config["EVENT_TIMEZONE"])).replace(tzinfo=None)
+
+# Helper function to decode a listing cursor of the form "<date_time ISO>,<id>"
+def parse_event_cursor(cursor):
+    try:
+        date_time, event_id = cursor.rsplit(",", 1)
+        return datetime.fromisoformat(date_time), int(event_id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+# Helper function to parse the optional from/to window of the listing
+def parse_window_arg(param):
+    value = request.args.get(param)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid {param}. Use ISO format, e.g. 2025-03-01T09:00")
+
+# Background upload finished: create the event, or patch the image of an existing one
+@upload_handler("event")
+def apply_event_upload(job, upload_result):
+    response_cache.invalidate_on_commit(db.session, "events")
+    if job.target_id:
+        event = Event.query.get(job.target_id)
+        if not event:
+            raise ValueError(f"Event {job.target_id} no longer exists")
+        for column, value in uploaded_image_fields(upload_result).items():
+            setattr(event, column, value)
+        return
+
+    event = Event(
+        title=job.payload["title"],
+        theme=job.payload["theme"],
+        details=job.payload["details"],
+        date_time=datetime.strptime(job.payload["date_time"], "%Y-%m-%dT%H:%M"),
+        location=job.payload["location"],
+        **uploaded_image_fields(upload_result),
+    )
+    db.session.add(event)
+    db.session.flush()
+    job.target_id = event.id
 
 # Create an event (Admin-only)
 @bp.route("/", methods=["POST"])
 @jwt_required()
+@admin_required
 def create_event():
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
-
     data = request.form
     image = request.files.get("image")
     if not image:
         return jsonify({"error": "Image is required"}), 400
 
+    if not all(data.get(field) for field in EVENT_FIELDS):
+        return jsonify({"error": f"All fields {EVENT_FIELDS} are required"}), 400
+
     try:
         # Parse datetime-local format
-        date_time = datetime.strptime(data.get("date_time"), "%Y-%m-%dT%H:%M")
-
-        # Upload image to Cloudinary
-        upload_result = cloudinary.uploader.upload(image)
-        image_url = upload_result.get("secure_url")
-
-        # Create and save the event
-        event = Event(
-            title=data.get("title"),
-            theme=data.get("theme"),
-            details=data.get("details"),
-            date_time=date_time,
-            location=data.get("location"),
-            image_url=image_url,
-        )
-        db.session.add(event)
-        db.session.commit()
-        return jsonify(event.to_dict()), 201
+        datetime.strptime(data.get("date_time"), "%Y-%m-%dT%H:%M")
+
+        # The event is saved once its image has been uploaded in the background
+        job = enqueue_upload(image, "event", payload={field: data.get(field) for field in EVENT_FIELDS})
+        return jsonify({"message": "Event image is uploading", "job": job.to_dict()}), 202
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
-# Fetch all events (Public)
+# Fetch events (Public): all of them, or a page of upcoming/past events or a date window
 @bp.route("/", methods=["GET"])
+@response_cache.cached("events")
 def get_events():
-    events = Event.query.order_by(Event.date_time.desc()).all()
-    return jsonify([event.to_dict() for event in events]), 200
+    # ?fields= or ?view=summary selects only those columns; rows skip the ORM entirely
+    try:
+        fields = requested_fields(request.args, Event)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    serialize = row_serializer(Event, fields)
+
+    def select_rows(query):
+        return project(query, Event, fields, keys=("date_time", "id"))
+
+    paging_params = ("when", "from", "to", "limit", "cursor")
+    if not any(param in request.args for param in paging_params):
+        events = select_rows(Event.query.order_by(Event.date_time.desc())).all()
+        return jsonify([serialize(event) for event in events]), 200
+
+    when = request.args.get("when")
+    if when and when not in EVENT_MODES:
+        return jsonify({"error": f"Invalid when. Choose from {EVENT_MODES}"}), 400
+    limit = request.args.get("limit", DEFAULT_EVENT_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MAX_EVENT_PAGE_SIZE))
+    try:
+        window_start = parse_window_arg("from")
+        window_end = parse_window_arg("to")
+        cursor = parse_event_cursor(request.args["cursor"]) if request.args.get("cursor") else None
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    now = event_now()
+    query = Event.query
+    if when == "upcoming":
+        query = query.filter(Event.date_time >= now)
+    elif when == "past":
+        query = query.filter(Event.date_time < now)
+    if window_start:
+        query = query.filter(Event.date_time >= window_start)
+    if window_end:
+        query = query.filter(Event.date_time < window_end)
+
+    # Past events read newest first; everything else in calendar order
+    position = tuple_(Event.date_time, Event.id)
+    if when == "past":
+        query = query.order_by(Event.date_time.desc(), Event.id.desc())
+        if cursor:
+            query = query.filter(position < cursor)
+    else:
+        query = query.order_by(Event.date_time.asc(), Event.id.asc())
+        if cursor:
+            query = query.filter(position > cursor)
+
+    # Fetch one extra row to know whether another page exists
+    rows = select_rows(query).limit(limit + 1).all()
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = f"{page[-1].date_time.isoformat()},{page[-1].id}"
+
+    # Upcoming/past results change the moment the next event starts, so the cached
+    # copy expires then instead of waiting for the full TTL
+    if when:
+        next_start = db.session.query(func.min(Event.date_time)).filter(Event.date_time >= now).scalar()
+        if next_start:
+            response_cache.expire_within((next_start - now).total_seconds())
+
+    return jsonify({"events": [serialize(event) for event in page], "next_cursor": next_cursor}), 200
 
 # Fetch event details (Public)
 @bp.route("/<int:id>", methods=["GET"])
+@response_cache.cached("events")
 def get_event(id):
     event = Event.query.get(id)
     if not event:
@@ -66,19 +170,14 @@ def get_event(id):
 # Update an event (Admin-only)
 @bp.route("/<int:id>", methods=["PUT"])
 @jwt_required()
+@admin_required
 def update_event(id):
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
-
     event = Event.query.get(id)
     if not event:
         return jsonify({"error": "Event not found"}), 404
 
     data = request.form
     image = request.files.get("image")
-    if image:
-        upload_result = cloudinary.uploader.upload(image)
-        event.image_url = upload_result.get("secure_url")
 
     try:
         # Parse datetime-local format if provided
@@ -89,7 +188,13 @@ def update_event(id):
         event.details = data.get("details", event.details)
         event.location = data.get("location", event.location)
 
+        response_cache.invalidate_on_commit(db.session, "events")
         db.session.commit()
+
+        # A new image is uploaded in the background and patched onto the event
+        if image:
+            job = enqueue_upload(image, "event", target_id=event.id)
+            return jsonify({**event.to_dict(), "job": job.to_dict()}), 202
         return jsonify(event.to_dict()), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 400
@@ -97,14 +202,13 @@ def update_event(id):
 # Delete an event (Admin-only)
 @bp.route("/<int:id>", methods=["DELETE"])
 @jwt_required()
+@admin_required
 def delete_event(id):
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
-
     event = Event.query.get(id)
     if not event:
         return jsonify({"error": "Event not found"}), 404
 
     db.session.delete(event)
+    response_cache.invalidate_on_commit(db.session, "events")
     db.session.commit()
     return jsonify({"message": "Event deleted successfully"}), 200
\ No newline at end of file
@@ -1,52 +1,183 @@
-from flask import Blueprint, request, jsonify
-from app import db
+from flask import Blueprint, request, jsonify, current_app
+from app import db, response_cache
 from app.models.gallery import Gallery
-from app.models.user import User
-import cloudinary.uploader
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.utils.decorators import admin_required
+from app.utils.image_variants import UPLOAD_OPTIONS, uploaded_image_fields
+from app.utils.monitoring import monitor
+from app.utils.projection import project, requested_fields, row_serializer
+from app.utils.upload_queue import cloudinary_uploader, enqueue_upload, upload_handler, get_uploader
+from flask_jwt_extended import jwt_required
+from concurrent.futures import ThreadPoolExecutor
+from sqlalchemy import insert, func, tuple_
+from datetime import datetime
+import hashlib
 
 bp = Blueprint("gallery_routes", __name__)
 
-# Helper function to check if the user is an admin
-def is_admin():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    return user and user.is_admin
+# Batch upload limits: files per request, and concurrent Cloudinary transfers. The
+# request waits for every transfer (eager variants included), so a batch is kept to
+# about three rounds of uploads, well inside gunicorn's 30s worker timeout. Larger
+# albums are sent as several batches.
+MAX_BATCH_FILES = 24
+BATCH_UPLOAD_WORKERS = 8
+
+# Public feed page sizes and caching policy
+DEFAULT_FEED_PAGE_SIZE = 24
+MAX_FEED_PAGE_SIZE = 100
+FEED_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=300"
+
+# Helper function to decode a feed cursor of the form "<uploaded_at ISO>,<id>"
+def parse_feed_cursor(cursor):
+    try:
+        uploaded_at, image_id = cursor.rsplit(",", 1)
+        return datetime.fromisoformat(uploaded_at), int(image_id)
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+# Background upload finished: save the gallery entry
+@upload_handler("gallery")
+def apply_gallery_upload(job, upload_result):
+    response_cache.invalidate_on_commit(db.session, "gallery")
+    new_image = Gallery(title=job.payload["title"], **uploaded_image_fields(upload_result))
+    db.session.add(new_image)
+    db.session.flush()
+    job.target_id = new_image.id
 
 # Admin: Upload Image
 @bp.route("/upload", methods=["POST"])
 @jwt_required()
+@admin_required
 def upload_image():
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
-
     if "image" not in request.files:
         return jsonify({"error": "No image file provided"}), 400
 
     image = request.files["image"]
     title = request.form.get("title", "Untitled")
 
-    # Upload to Cloudinary
-    upload_result = cloudinary.uploader.upload(image)
-    image_url = upload_result.get("secure_url")
-
-    # Save to database
-    new_image = Gallery(title=title, image_url=image_url)
-    db.session.add(new_image)
-    db.session.commit()
+    # Upload to Cloudinary in the background; the entry is saved once it completes
+    job = enqueue_upload(image, "gallery", payload={"title": title})
 
-    return jsonify({"message": "Image uploaded successfully!", "image": new_image.to_dict()}), 201
+    return jsonify({"message": "Image is uploading", "job": job.to_dict()}), 202
 
-# Public: Get All Gallery Images
+# Admin: Upload many images in one request
+@bp.route("/upload/batch", methods=["POST"])
+@jwt_required()
+@admin_required
+def upload_images_batch():
+    images = request.files.getlist("images")
+    if not images:
+        return jsonify({"error": "No image files provided"}), 400
+    if len(images) > MAX_BATCH_FILES:
+        return jsonify({"error": f"At most {MAX_BATCH_FILES} images per batch"}), 400
+
+    # Optional per-file titles (same order as the files), falling back to a shared title
+    titles = request.form.getlist("titles")
+    default_title = request.form.get("title", "Untitled")
+
+    uploader = get_uploader(current_app)
+
+    def upload(image):
+        try:
+            with monitor.track_external("cloudinary"):
+                return uploaded_image_fields(uploader(image.stream, **UPLOAD_OPTIONS)), None
+        except Exception as e:
+            return None, str(e)
+
+    # Transfer to Cloudinary in parallel with a bounded pool
+    workers = min(current_app.config.get("BATCH_UPLOAD_WORKERS", BATCH_UPLOAD_WORKERS), len(images))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        outcomes = list(executor.map(upload, images))
+
+    results = []
+    rows = []
+    for index, (image, (image_fields, error)) in enumerate(zip(images, outcomes)):
+        result = {"filename": image.filename}
+        if error:
+            result.update(status="failed", error=error)
+        else:
+            result["status"] = "uploaded"
+            rows.append({"title": titles[index] if index < len(titles) else default_title, **image_fields})
+        results.append(result)
+
+    # Save every successful upload with a single multi-row INSERT
+    if rows:
+        inserted = db.session.execute(
+            insert(Gallery).returning(Gallery, sort_by_parameter_order=True), rows
+        ).scalars().all()
+        response_cache.invalidate_on_commit(db.session, "gallery")
+        db.session.commit()
+
+        uploaded = iter(inserted)
+        for result in results:
+            if result["status"] == "uploaded":
+                result["image"] = next(uploaded).to_dict()
+
+    if not rows:
+        status = 502
+    elif len(rows) < len(images):
+        status = 207
+    else:
+        status = 201
+    return jsonify({"uploaded": len(rows), "failed": len(images) - len(rows), "results": results}), status
+
+# Public: Get Gallery Images (newest first, optionally paginated)
 @bp.route("/", methods=["GET"])
+@response_cache.cached("gallery")
 def get_gallery():
-    images = Gallery.query.order_by(Gallery.uploaded_at.desc()).all()
-    if images:
-        return jsonify({"images": [image.to_dict() for image in images]}), 200
-    return jsonify({"message": "No images found"}), 404
-
+    # The newest upload time plus the row count changes on every upload and delete,
+    # so it validates cached copies without running the page query.
+    latest, total = db.session.query(func.max(Gallery.uploaded_at), func.count(Gallery.id)).one()
+    version = f"{latest}|{total}|{request.query_string.decode()}"
+
+    response = jsonify()
+    response.set_etag(hashlib.sha1(version.encode()).hexdigest())
+    if latest:
+        response.last_modified = latest
+    response.headers["Cache-Control"] = FEED_CACHE_CONTROL
+    response.make_conditional(request)
+    if response.status_code == 304:
+        return response
+
+    # ?fields= or ?view=summary selects only those columns; rows skip the ORM entirely
+    try:
+        fields = requested_fields(request.args, Gallery)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    serialize = row_serializer(Gallery, fields)
+
+    query = Gallery.query.order_by(Gallery.uploaded_at.desc(), Gallery.id.desc())
+    query = project(query, Gallery, fields, keys=("uploaded_at", "id"))
+
+    # Without paging params, keep returning every image
+    if "limit" not in request.args and "cursor" not in request.args:
+        images = query.all()
+        response.set_data(jsonify({"images": [serialize(image) for image in images]}).get_data())
+        return response
+
+    limit = request.args.get("limit", DEFAULT_FEED_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MAX_FEED_PAGE_SIZE))
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            uploaded_at, image_id = parse_feed_cursor(cursor)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        query = query.filter(tuple_(Gallery.uploaded_at, Gallery.id) < (uploaded_at, image_id))
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.limit(limit + 1).all()
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = f"{page[-1].uploaded_at.isoformat()},{page[-1].id}"
+
+    body = {"images": [serialize(image) for image in page], "next_cursor": next_cursor, "total": total}
+    response.set_data(jsonify(body).get_data())
+    return response
 
 @bp.route("/about-image", methods=["GET"]) # Public: Get About Image
+@response_cache.cached("gallery")
 def get_about_image():
     # Fetch the image with a specific title (e.g., "About Us")
     image = Gallery.query.filter_by(title="kc_about_us_img").first()
@@ -57,20 +188,20 @@ def get_about_image():
 # Admin: Delete Image
 @bp.route("/<int:image_id>", methods=["DELETE"])
 @jwt_required()
+@admin_required
 def delete_image(image_id):
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
-
     image = Gallery.query.get(image_id)
     if not image:
         return jsonify({"error": "Image not found"}), 404
 
     # Delete from Cloudinary
     public_id = image.image_url.split("/")[-1].split(".")[0]  # Extract public ID
-    cloudinary.uploader.destroy(public_id)
+    with monitor.track_external("cloudinary"):
+        cloudinary_uploader(current_app).destroy(public_id)
 
     # Delete from DB
     db.session.delete(image)
+    response_cache.invalidate_on_commit(db.session, "gallery")
     db.session.commit()
 
     return jsonify({"message": "Image deleted successfully!"})
@@ -1,9 +1,12 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 from app import db
-from app.models.newsletter import NewsletterSubscriber
-from app.utils.email_service import send_email
+from app.models.newsletter import NewsletterSubscriber, NewsletterCampaign
+from app.utils.campaign_sender import campaign_report, claim_campaign, resumable_campaign_ids, run_campaign, start_campaign
+from app.utils.decorators import admin_required
+from app.utils.email_service import queue_email, flush_outbox
+from flask_jwt_extended import jwt_required
 
-bp = Blueprint("newsletter_routes", __name__)
+bp = Blueprint("newsletter_routes", __name__, cli_group="email")
 
 # 📩 Subscribe to Newsletter
 @bp.route("/newsletter/subscribe", methods=["POST"])
@@ -46,8 +49,72 @@ def contact_us():
     <p>{message}</p>
     """
 
-    # Send email to the designated admin
-    if send_email("info@kamaruchallenge.africa", subject, content):
-        return jsonify({"message": "Message sent successfully!"}), 200
-    else:
-        return jsonify({"error": "Failed to send message"}), 500
+    # Queue email to the designated admin; the background sender delivers it
+    queue_email("info@kamaruchallenge.africa", subject, content)
+    return jsonify({"message": "Message sent successfully!"}), 200
+
+# Admin: Create a newsletter campaign (draft)
+@bp.route("/newsletter/campaigns", methods=["POST"])
+@jwt_required()
+@admin_required
+def create_campaign():
+    data = request.get_json()
+    subject = data.get("subject")
+    html_content = data.get("html_content")
+
+    if not subject or not html_content:
+        return jsonify({"error": "Subject and html_content are required"}), 400
+
+    campaign = NewsletterCampaign(subject=subject, html_content=html_content)
+    db.session.add(campaign)
+    db.session.commit()
+
+    return jsonify({"message": "Campaign created", "campaign": campaign.to_dict()}), 201
+
+# Admin: Send a campaign to all subscribers (or resume a stalled one, or retry its failed deliveries)
+@bp.route("/newsletter/campaigns/<int:campaign_id>/send", methods=["POST"])
+@jwt_required()
+@admin_required
+def send_campaign(campaign_id):
+    campaign = NewsletterCampaign.query.get(campaign_id)
+    if not campaign:
+        return jsonify({"error": "Campaign not found"}), 404
+
+    if not start_campaign(current_app._get_current_object(), campaign_id):
+        return jsonify({"error": f"Campaign is already {campaign.status}"}), 409
+
+    return jsonify({"message": "Campaign is sending", "campaign": campaign_report(campaign)}), 202
+
+# Admin: Campaign progress and throughput
+@bp.route("/newsletter/campaigns/<int:campaign_id>", methods=["GET"])
+@jwt_required()
+@admin_required
+def get_campaign(campaign_id):
+    campaign = NewsletterCampaign.query.get(campaign_id)
+    if not campaign:
+        return jsonify({"error": "Campaign not found"}), 404
+    return jsonify(campaign_report(campaign)), 200
+
+# CLI: `flask email resume-campaigns` finishes campaigns whose sender died mid-way and
+# retries failed deliveries, each up to DELIVERY_ATTEMPTS runs
+@bp.cli.command("resume-campaigns")
+def resume_campaigns_command():
+    """Resume stalled newsletter campaigns and retry failed deliveries in the foreground."""
+    app = current_app._get_current_object()
+    for campaign_id in resumable_campaign_ids():
+        if claim_campaign(campaign_id):
+            print(f"Resuming campaign {campaign_id}")
+            run_campaign(app, campaign_id)
+
+# CLI: `flask email flush` delivers everything currently due in the outbox
+@bp.cli.command("flush")
+def flush_outbox_command():
+    """Send all due emails from the outbox."""
+    app = current_app._get_current_object()
+    total = 0
+    while True:
+        sent = flush_outbox(app)
+        if not sent:
+            break
+        total += sent
+    print(f"Processed {total} email(s)")
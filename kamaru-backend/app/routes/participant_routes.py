@@ -1,20 +1,148 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify, Response, stream_with_context
 from app import db
 from app.models.participant import Participant
 from app.models.user import User
+from app.utils.decorators import admin_required
+from app.utils.dialect import conflict_insert
+from app.utils.projection import project, requested_fields, row_serializer
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import func, or_, select
+from datetime import datetime
+import csv
+import io
 
 bp = Blueprint("participant_routes", __name__)
 
-# Helper function to check if the user is an admin
-def is_admin():
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-    return user and user.is_admin
-
 # Allowed categories
 ALLOWED_CATEGORIES = ["Poetry", "Folk Songs", "Original Songs", "Rendition"]
 
+# Page size limits for the keyset-paginated listing
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+# Columns available to the streaming export, and rows fetched per cursor round trip
+EXPORT_FIELDS = ["id", "name", "email", "phone", "category", "registered_at"]
+EXPORT_BATCH_SIZE = 1000
+
+# Bulk import limits: rows per file, and rows per INSERT statement
+MAX_IMPORT_ROWS = 20000
+IMPORT_CHUNK_SIZE = 1000
+IMPORT_FIELDS = ["name", "email", "phone", "category"]
+
+# Helper function to parse an optional ISO datetime query param
+def parse_datetime_arg(args, param):
+    value = args.get(param)
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid {param}. Use ISO format, e.g. 2025-03-01T09:00")
+
+# Helper function to build SQL filters from the listing query string
+def participant_filters(args):
+    """Return filter clauses for category, registered_at range and name/email prefix.
+
+    Raises ValueError with a client-facing message on invalid input.
+    """
+    filters = []
+
+    category = args.get("category")
+    if category:
+        if category not in ALLOWED_CATEGORIES:
+            raise ValueError(f"Invalid category. Choose from {ALLOWED_CATEGORIES}")
+        filters.append(Participant.category == category)
+
+    registered_from = parse_datetime_arg(args, "registered_from")
+    if registered_from:
+        filters.append(Participant.registered_at >= registered_from)
+
+    registered_to = parse_datetime_arg(args, "registered_to")
+    if registered_to:
+        filters.append(Participant.registered_at <= registered_to)
+
+    q = args.get("q")
+    if q:
+        # Escape LIKE wildcards so the search is a literal prefix match
+        prefix = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        filters.append(or_(
+            Participant.name.ilike(prefix, escape="\\"),
+            Participant.email.ilike(prefix, escape="\\"),
+        ))
+
+    return filters
+
+# Helper function to register one participant in a single INSERT ... ON CONFLICT DO NOTHING RETURNING
+def insert_participant(**values):
+    """Return (participant dict, None) on success or (None, "email"/"phone") if either is already taken.
+
+    The unique constraints decide, so simultaneous registrations cannot race past a
+    pre-check. RETURNING hands back every column, so the response is built without
+    loading the row again; only the conflict path pays for a second query to name the field.
+    """
+    columns = Participant.__table__.columns
+    statement = conflict_insert(Participant).on_conflict_do_nothing().returning(*columns)
+    row = db.session.execute(statement, values).first()
+    if row is None:
+        db.session.rollback()
+        email_taken = db.session.query(Participant.id).filter_by(email=values["email"]).first()
+        return None, "email" if email_taken else "phone"
+
+    participant = row_serializer(Participant, columns.keys())(row)
+    db.session.commit()
+    return participant, None
+
+# Helper function to read a phone number from an XLSX cell as text
+def xlsx_phone(cell):
+    """Spreadsheets often store phone numbers as numbers, dropping the leading zero.
+
+    A zero-padded number format such as "0000000000" restores it. Decimal numbers
+    cannot be read back reliably and raise ValueError.
+    """
+    value = cell.value
+    if isinstance(value, float):
+        raise ValueError("Phone is a decimal number; format the phone column as text")
+    if isinstance(value, int) and not isinstance(value, bool):
+        number_format = (getattr(cell, "number_format", None) or "").strip()
+        if number_format and set(number_format) == {"0"}:
+            return str(value).zfill(len(number_format))
+        return str(value)
+    return value
+
+# Helper function to read import rows from an uploaded CSV or XLSX file
+def read_import_rows(file):
+    """Return a list of dicts keyed by lower-cased header. Raises ValueError on unreadable files.
+
+    A row whose cells cannot be read carries the reason under "row_error".
+    """
+    filename = (file.filename or "").lower()
+    if filename.endswith(".xlsx"):
+        try:
+            import openpyxl
+        except ImportError:
+            raise ValueError("XLSX import requires the openpyxl package; upload a CSV instead")
+        sheet = openpyxl.load_workbook(file.stream, read_only=True).active
+        rows = sheet.iter_rows()
+        header = [str(cell.value or "").strip().lower() for cell in next(rows, [])]
+        records = []
+        for cells in rows:
+            record = {}
+            for name, cell in zip(header, cells):
+                if name == "phone":
+                    try:
+                        record[name] = xlsx_phone(cell)
+                    except ValueError as e:
+                        record["row_error"] = str(e)
+                else:
+                    record[name] = cell.value
+            records.append(record)
+        return records
+    if filename.endswith(".csv"):
+        reader = csv.DictReader(io.TextIOWrapper(file.stream, encoding="utf-8-sig"))
+        reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+        return list(reader)
+    raise ValueError("Unsupported file type. Upload a .csv or .xlsx file")
+
 # -------------------- Public Routes --------------------
 
 # Logged-in User Register Participant
@@ -41,26 +169,19 @@ def user_register_participant():
     if category not in ALLOWED_CATEGORIES:
         return jsonify({"error": f"Invalid category. Choose from {ALLOWED_CATEGORIES}"}), 400
 
-    # Check if email or phone already exists
-    if Participant.query.filter_by(email=email).first() or Participant.query.filter_by(phone=phone).first():
-        return jsonify({"error": "Email or phone already registered"}), 409
+    participant, conflict = insert_participant(name=name, email=email, phone=phone, category=category)
+    if conflict:
+        return jsonify({"error": f"{conflict.capitalize()} already registered", "field": conflict}), 409
 
-    participant = Participant(name=name, email=email, phone=phone, category=category)
-    
-    db.session.add(participant)
-    db.session.commit()
-
-    return jsonify({"message": "Registration successful!", "participant": participant.to_dict()}), 201
+    return jsonify({"message": "Registration successful!", "participant": participant}), 201
 
 # -------------------- Admin Routes --------------------
 
 # Admin: Register Participant
 @bp.route("/admin", methods=["POST"])
 @jwt_required()
+@admin_required
 def admin_register_participant():
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
-
     data = request.get_json()
     name = data.get("name")
     email = data.get("email")
@@ -75,33 +196,193 @@ def admin_register_participant():
     if category not in ALLOWED_CATEGORIES:
         return jsonify({"error": f"Invalid category. Choose from {ALLOWED_CATEGORIES}"}), 400
 
-    # Check if email or phone already exists
-    if Participant.query.filter_by(email=email).first() or Participant.query.filter_by(phone=phone).first():
-        return jsonify({"error": "Email or phone already registered"}), 409
+    participant, conflict = insert_participant(name=name, email=email, phone=phone, category=category)
+    if conflict:
+        return jsonify({"error": f"{conflict.capitalize()} already registered", "field": conflict}), 409
+
+    return jsonify({"message": "Participant registered successfully by admin!", "participant": participant}), 201
+
+# Admin: Bulk Import Participants from CSV/XLSX
+@bp.route("/import", methods=["POST"])
+@jwt_required()
+@admin_required
+def import_participants():
+    if "file" not in request.files:
+        return jsonify({"error": "No file provided"}), 400
+
+    try:
+        rows = read_import_rows(request.files["file"])
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if len(rows) > MAX_IMPORT_ROWS:
+        return jsonify({"error": f"At most {MAX_IMPORT_ROWS} rows per import"}), 400
+
+    # Validate each row and catch duplicates within the file itself
+    report = []
+    candidates = []
+    seen_emails, seen_phones = set(), set()
+    for index, row in enumerate(rows, start=2):  # Row 1 is the header
+        values = {field: str(row.get(field) or "").strip() for field in IMPORT_FIELDS}
+        entry = {"row": index, "email": values["email"]}
+        report.append(entry)
+
+        if row.get("row_error"):
+            entry.update(status="error", error=row["row_error"])
+        elif not all(values.values()):
+            entry.update(status="error", error="All fields (name, email, phone, category) are required")
+        elif values["category"] not in ALLOWED_CATEGORIES:
+            entry.update(status="error", error=f"Invalid category. Choose from {ALLOWED_CATEGORIES}")
+        elif values["email"] in seen_emails or values["phone"] in seen_phones:
+            entry.update(status="error", error="Duplicate email or phone within the file")
+        else:
+            seen_emails.add(values["email"])
+            seen_phones.add(values["phone"])
+            candidates.append((entry, values))
+
+    # One set-based query finds every row that clashes with an existing participant
+    existing_emails, existing_phones = set(), set()
+    if candidates:
+        for email, phone in db.session.query(Participant.email, Participant.phone).filter(
+            or_(Participant.email.in_(seen_emails), Participant.phone.in_(seen_phones))
+        ):
+            existing_emails.add(email)
+            existing_phones.add(phone)
+
+    to_insert = []
+    for entry, values in candidates:
+        if values["email"] in existing_emails or values["phone"] in existing_phones:
+            entry.update(status="error", error="Email or phone already registered")
+        else:
+            to_insert.append((entry, values))
+
+    # Insert in chunks; ON CONFLICT DO NOTHING absorbs rows registered concurrently
+    inserted = 0
+    for start in range(0, len(to_insert), IMPORT_CHUNK_SIZE):
+        chunk = to_insert[start:start + IMPORT_CHUNK_SIZE]
+        statement = conflict_insert(Participant).on_conflict_do_nothing().returning(Participant.email)
+        created = set(db.session.execute(statement, [values for _, values in chunk]).scalars())
+        for entry, values in chunk:
+            if values["email"] in created:
+                entry["status"] = "inserted"
+            else:
+                entry.update(status="error", error="Email or phone already registered")
+        inserted += len(created)
 
-    participant = Participant(name=name, email=email, phone=phone, category=category)
-    
-    db.session.add(participant)
     db.session.commit()
 
-    return jsonify({"message": "Participant registered successfully by admin!", "participant": participant.to_dict()}), 201
+    return jsonify({"inserted": inserted, "failed": len(report) - inserted, "rows": report}), 200
 
 # Admin: Get All Participants
 @bp.route("/", methods=["GET"])
 @jwt_required()
+@admin_required
 def get_participants():
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
+    try:
+        filters = participant_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # ?fields= or ?view=summary selects only those columns; rows skip the ORM entirely
+    try:
+        fields = requested_fields(request.args, Participant)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    serialize = row_serializer(Participant, fields)
+
+    def select_rows(query):
+        return project(query, Participant, fields)
+
+    # Without paging params, keep returning the full (filtered) list
+    if "limit" not in request.args and "after_id" not in request.args:
+        participants = select_rows(Participant.query.filter(*filters).order_by(Participant.id)).all()
+        return jsonify([serialize(p) for p in participants]), 200
+
+    after_id = request.args.get("after_id", 0, type=int)
+    limit = request.args.get("limit", DEFAULT_PAGE_SIZE, type=int)
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+
+    # Keyset pagination: one indexed range scan on the primary key per page.
+    # Fetch one extra row to know whether another page exists.
+    rows = (
+        select_rows(Participant.query.filter(*filters))
+        .filter(Participant.id > after_id)
+        .order_by(Participant.id)
+        .limit(limit + 1)
+        .all()
+    )
+    page = rows[:limit]
+
+    response = jsonify([serialize(p) for p in page])
+    if len(rows) > limit:
+        response.headers["X-Next-After-Id"] = str(page[-1].id)
+
+    # The total only needs computing once per listing, on the first page
+    if not after_id:
+        total = db.session.query(func.count(Participant.id)).filter(*filters).scalar()
+        response.headers["X-Total-Count"] = str(total)
+
+    return response, 200
+# Admin: Export Participants (streamed as NDJSON or CSV)
+@bp.route("/export", methods=["GET"])
+@jwt_required()
+@admin_required
+def export_participants():
+    export_format = request.args.get("format", "ndjson")
+    if export_format not in ("ndjson", "csv"):
+        return jsonify({"error": "Invalid format. Choose from ['ndjson', 'csv']"}), 400
+
+    fields = request.args.get("fields")
+    fields = fields.split(",") if fields else EXPORT_FIELDS
+    unknown = [field for field in fields if field not in EXPORT_FIELDS]
+    if unknown:
+        return jsonify({"error": f"Invalid fields {unknown}. Choose from {EXPORT_FIELDS}"}), 400
+
+    try:
+        filters = participant_filters(request.args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Select plain columns (no ORM objects) through a server-side cursor,
+    # so memory stays constant regardless of table size.
+    query = (
+        select(*[getattr(Participant, field) for field in fields])
+        .filter(*filters)
+        .order_by(Participant.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+    serialize = row_serializer(Participant, fields)
+    dumps = current_app.json.dumps
+
+    def generate_ndjson():
+        for rows in db.session.execute(query).partitions():
+            yield "".join(dumps(serialize(row)) + "\n" for row in rows)
+
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=fields)
+        writer.writeheader()
+        for rows in db.session.execute(query).partitions():
+            writer.writerows(serialize(row) for row in rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        yield buffer.getvalue()
+
+    if export_format == "csv":
+        generator, mimetype = generate_csv, "text/csv"
+    else:
+        generator, mimetype = generate_ndjson, "application/x-ndjson"
+
+    response = Response(stream_with_context(generator()), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f"attachment; filename=participants.{export_format}"
+    return response
 
-    participants = Participant.query.all()
-    return jsonify([p.to_dict() for p in participants]), 200
 # Admin: Update a Participant
 @bp.route("/<int:id>", methods=["PUT"])
 @jwt_required()
+@admin_required
 def update_participant(id):
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
-
     participant = Participant.query.get(id)
     if not participant:
         return jsonify({"error": "Participant not found"}), 404
@@ -122,10 +403,8 @@ def update_participant(id):
 # Admin: Delete a Participant
 @bp.route("/<int:id>", methods=["DELETE"])
 @jwt_required()
+@admin_required
 def delete_participant(id):
-    if not is_admin():
-        return jsonify({"error": "Admin access required"}), 403
-
     participant = Participant.query.get(id)
     if not participant:
         return jsonify({"error": "Participant not found"}), 404
@@ -1,29 +1,120 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, jsonify, request
+from app import db, response_cache
 from app.models.event import Event
+from app.models.gallery import Gallery
 from app.models.participant import Participant
 from app.models.user import User
 from app.models.video import Video
-from app.models.gallery import Gallery
-from app import db
+from app.routes.participant_routes import ALLOWED_CATEGORIES, parse_datetime_arg
+from app.utils.cache import TTLCache
+from app.utils.decorators import admin_required
+from flask_jwt_extended import jwt_required
+from sqlalchemy import func, select
 
 bp = Blueprint("stats_routes", __name__)
 
+# Bucket sizes for the registration curve, as (date_trunc unit, SQLite strftime format)
+BUCKET_GRANULARITIES = {
+    "hour": ("hour", "%Y-%m-%d %H:00:00"),
+    "day": ("day", "%Y-%m-%d 00:00:00"),
+    "month": ("month", "%Y-%m-01 00:00:00"),
+}
+
+# Models counted by /api/stats, keyed by the name each count is served under
+COUNTED_MODELS = {
+    "total_events": Event,
+    "total_participants": Participant,
+    "total_users": User,
+    "total_videos": Video,
+    "total_gallery_items": Gallery,
+}
+
+# Site totals are recounted at most once a minute per worker; writes never touch them
+site_stats_cache = TTLCache(maxsize=1, ttl=60)
+
+# Participant breakdowns are cached briefly; the dashboard polls them while charting
+participant_stats_cache = TTLCache(maxsize=64, ttl=60)
+
+# Helper function to truncate registered_at to a bucket in SQL
+def registration_bucket(granularity):
+    unit, sqlite_format = BUCKET_GRANULARITIES[granularity]
+    if db.engine.dialect.name == "sqlite":
+        return func.strftime(sqlite_format, Participant.registered_at)
+    return func.date_trunc(unit, Participant.registered_at)
+
+# Helper function to count every counted table in one query
+def count_rows():
+    return db.session.execute(select(*(
+        select(func.count()).select_from(model).scalar_subquery().label(name)
+        for name, model in COUNTED_MODELS.items()
+    ))).one()._asdict()
+
+# Helper function to compute category and time-series breakdowns in one GROUP BY
+def compute_participant_stats(granularity, registered_from, registered_to):
+    bucket = registration_bucket(granularity).label("bucket")
+    query = (
+        db.session.query(Participant.category, bucket, func.count(Participant.id))
+        .filter(Participant.registered_at.isnot(None))
+        .group_by(Participant.category, bucket)
+        .order_by(bucket)
+    )
+    if registered_from:
+        query = query.filter(Participant.registered_at >= registered_from)
+    if registered_to:
+        query = query.filter(Participant.registered_at <= registered_to)
+
+    by_category = dict.fromkeys(ALLOWED_CATEGORIES, 0)
+    by_bucket = {}
+    for category, bucket_start, count in query.all():
+        if not isinstance(bucket_start, str):
+            bucket_start = bucket_start.strftime("%Y-%m-%d %H:%M:%S")
+        by_category[category] = by_category.get(category, 0) + count
+        by_bucket[bucket_start] = by_bucket.get(bucket_start, 0) + count
+
+    return {
+        "granularity": granularity,
+        "total": sum(by_category.values()),
+        "by_category": by_category,
+        "registrations": [{"bucket": key, "count": value} for key, value in by_bucket.items()],
+    }
+
 @bp.route("/", methods=["GET", "OPTIONS"])
 def get_stats():
     try:
-        total_events = db.session.query(Event).count()
-        total_participants = db.session.query(Participant).count()
-        total_users = db.session.query(User).count()
-        total_videos = db.session.query(Video).count()
-        total_gallery_items = db.session.query(Gallery).count()
-
-        stats = {
-            "total_events": total_events,
-            "total_participants": total_participants,
-            "total_users": total_users,
-            "total_videos": total_videos,
-            "total_gallery_items": total_gallery_items,
-        }
-        return jsonify(stats), 200
+        stats = site_stats_cache.get_or_set("counts", count_rows)
+
+        # Counts are refreshed at most once a minute, so let browsers revalidate with If-None-Match
+        response = jsonify(stats)
+        response.add_etag()
+        response.headers["Cache-Control"] = "no-cache"
+        return response.make_conditional(request)
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+# Admin: Participant registrations by category and over time
+@bp.route("/participants", methods=["GET"])
+@jwt_required()
+@admin_required
+def get_participant_stats():
+    granularity = request.args.get("bucket", "day")
+    if granularity not in BUCKET_GRANULARITIES:
+        return jsonify({"error": f"Invalid bucket. Choose from {list(BUCKET_GRANULARITIES)}"}), 400
+
+    try:
+        registered_from = parse_datetime_arg(request.args, "registered_from")
+        registered_to = parse_datetime_arg(request.args, "registered_to")
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    stats = participant_stats_cache.get_or_set(
+        (granularity, registered_from, registered_to),
+        lambda: compute_participant_stats(granularity, registered_from, registered_to),
+    )
+    return jsonify(stats), 200
+
+# Admin: Response cache hit/miss counts for this worker
+@bp.route("/cache", methods=["GET"])
+@jwt_required()
+@admin_required
+def get_cache_stats():
+    return jsonify(response_cache.metrics()), 200
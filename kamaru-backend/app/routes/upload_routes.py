@@ -0,0 +1,80 @@
+from flask import Blueprint, jsonify, current_app
+from app import db, response_cache
+from app.models.event import Event
+from app.models.gallery import Gallery
+from app.models.sys_images import SystemImage
+from app.models.upload_job import UploadJob
+from app.utils.decorators import admin_required
+from app.utils.image_variants import image_fields, public_id
+from app.utils.monitoring import monitor
+from app.utils.upload_queue import get_resource_lookup, pending_upload_ids, run_upload_job
+from flask_jwt_extended import jwt_required
+from sqlalchemy import or_
+
+bp = Blueprint("upload_routes", __name__, cli_group="uploads")
+
+# Models holding Cloudinary images, and the response cache group serving each
+IMAGE_MODELS = [(Gallery, "gallery"), (Event, "events"), (SystemImage, "system_images")]
+BACKFILL_BATCH_SIZE = 500
+
+# Admin: Check the status of a background upload
+@bp.route("/<int:job_id>", methods=["GET"])
+@jwt_required()
+@admin_required
+def get_upload_job(job_id):
+    job = UploadJob.query.get(job_id)
+    if not job:
+        return jsonify({"error": "Upload job not found"}), 404
+    return jsonify(job.to_dict()), 200
+
+# CLI: `flask uploads resume` runs uploads interrupted by a restart, one after another
+@bp.cli.command("resume")
+def resume_uploads_command():
+    """Run pending and stale background uploads to completion."""
+    app = current_app._get_current_object()
+    # Inline rather than on the worker pool, so retries finish before the command exits
+    job_ids = pending_upload_ids(app)
+    for job_id in job_ids:
+        run_upload_job(app, job_id)
+    print(f"Resumed {len(job_ids)} upload job(s)")
+
+# CLI: `flask uploads backfill-variants` adds responsive variants to images uploaded before they existed
+@bp.cli.command("backfill-variants")
+def backfill_variants_command():
+    """Fill in dimensions, variant URLs and srcset for images that lack them.
+
+    Dimensions are read from the Cloudinary Admin API, which is rate limited per
+    hour; images it could not describe are left as they were, for a later re-run.
+    Cloudinary builds the derivatives on their first request instead of eagerly.
+    """
+    lookup = get_resource_lookup(current_app._get_current_object())
+    for model, group in IMAGE_MODELS:
+        updated = skipped = 0
+        last_id = 0
+        while True:
+            images = (
+                model.query.filter(or_(model.image_srcset.is_(None), model.image_width.is_(None)), model.id > last_id)
+                .order_by(model.id).limit(BACKFILL_BATCH_SIZE).all()
+            )
+            if not images:
+                break
+            for image in images:
+                width, height = image.image_width, image.image_height
+                if not width and public_id(image.image_url):
+                    try:
+                        with monitor.track_external("cloudinary"):
+                            resource = lookup(public_id(image.image_url))
+                        width, height = resource["width"], resource["height"]
+                    except Exception as e:
+                        print(f"{model.__name__} {image.id}: could not read dimensions ({e})")
+                        skipped += 1
+                        continue
+                fields = image_fields(image.image_url, width, height)
+                if fields["image_srcset"]:
+                    for column, value in fields.items():
+                        setattr(image, column, value)
+                    updated += 1
+            last_id = images[-1].id
+            response_cache.invalidate_on_commit(db.session, group)
+            db.session.commit()
+        print(f"{model.__name__}: added variants to {updated} image(s), skipped {skipped}")
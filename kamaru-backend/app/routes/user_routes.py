@@ -1,27 +1,15 @@
 import random
 import string
-from flask import Blueprint, request, jsonify
-from app import db
+from flask import Blueprint, current_app, request, jsonify
+from app import db, rate_limiter
 from app.models.user import User
-from app.utils.decorators import admin_required
+from app.utils.decorators import admin_required, invalidate_admin_cache
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
-from functools import wraps
-from datetime import datetime
-from app.utils.email_service import send_email
+from app.utils.email_service import queue_email
 from app.models.short_token import ShortToken
+from app.utils.token_sweeper import start_sweeper, sweep_expired_tokens
 
-bp = Blueprint("user_routes", __name__) # Create a new blueprint for user routes
-
-# Decorator to check if user is an admin before accessing a route (admin-only)
-def admin_required(fn): # Decorator function that takes a function as an argument and returns a new function
-    @wraps(fn) # Preserve the original function's metadata (name, docstring, etc.)
-    def wrapper(*args, **kwargs): # New function that takes any number of positional and keyword arguments
-        current_user_id = get_jwt_identity() # Get the current user's ID from the JWT token
-        user = User.query.get(current_user_id) # Get the user object from the database
-        if not user or not user.is_admin:
-            return jsonify({"error": "Admin access required"}), 403
-        return fn(*args, **kwargs) # Call the original function with the arguments and keyword arguments
-    return wrapper # Return the new function
+bp = Blueprint("user_routes", __name__, cli_group="users") # Create a new blueprint for user routes
 
 # Function to generate a random 6-character alphanumeric token
 def generate_short_token():
@@ -65,6 +53,7 @@ def register():
 
 # User Login
 @bp.route("/login", methods=["POST"])
+@rate_limiter.limit("login", ip=(20, 60), email=(5, 300))
 def login():
     data = request.get_json() # Get data from request
     email = data.get("email")
@@ -75,11 +64,16 @@ def login():
     if not user or not user.check_password(password):
         return jsonify({"error": "Invalid email or password"}), 401
 
+    # Save the upgraded hash if the hashing parameters changed since it was stored
+    if user in db.session.dirty:
+        db.session.commit()
+
     # Generate JWT token
     access_token = create_access_token(identity=str(user.id))
     return jsonify({"message": "Login successful!", "token": access_token, "is_admin": user.is_admin}), 200
 
 @bp.route("/forgot_password", methods=["POST"])
+@rate_limiter.limit("forgot_password", ip=(5, 300), email=(3, 900))
 def forgot_password():
     data = request.get_json()
     email = data.get("email")
@@ -89,6 +83,7 @@ def forgot_password():
         return jsonify({"error": "User not found"}), 404
 
     short_token = ShortToken.generate_token(user.id)
+    start_sweeper(current_app._get_current_object())  # Clears out codes that are never used
 
     subject = "Password Reset Code"
     content = f"""
@@ -99,29 +94,29 @@ def forgot_password():
     <p>If you did not request this, please ignore this email.</p>
     """
 
-    if send_email(email, subject, content):
-        return jsonify({"message": "Password reset code sent to your email"}), 200
-    else:
-        return jsonify({"error": "Failed to send reset code"}), 500
+    # Delivered by the background sender so a slow Brevo response doesn't block the request
+    queue_email(email, subject, content)
+    return jsonify({"message": "Password reset code sent to your email"}), 200
 
 
 @bp.route("/reset_password", methods=["POST"])
+# Keyed by IP only: a guesser varies the code on every try, so a per-code bucket never fills
+@rate_limiter.limit("reset_password", ip=(10, 300))
 def reset_password():
     data = request.get_json()
     short_token = data.get("short_token")
     new_password = data.get("new_password")
 
-    token_entry = ShortToken.query.filter_by(short_token=short_token).first()
-
-    if not token_entry or token_entry.expires_at < datetime.utcnow():
+    # Remove the used token; expiry is checked in the same statement
+    user_id = ShortToken.consume(short_token)
+    if user_id is None:
         return jsonify({"error": "Invalid or expired reset code"}), 400
 
-    user = User.query.get(token_entry.user_id)
+    user = User.query.get(user_id)
     if not user:
         return jsonify({"error": "User not found"}), 404
 
     user.set_password(new_password)
-    db.session.delete(token_entry)  # Remove the used token
     db.session.commit()
 
     return jsonify({"message": "Password reset successfully!"}), 200
@@ -159,6 +154,7 @@ def update_user(user_id):
     user.is_admin = data.get("is_admin", user.is_admin)
 
     db.session.commit()
+    invalidate_admin_cache(user_id)
     return jsonify({"message": "User updated successfully", "user": user.to_dict()}), 200
 
 # Delete a user (admin-only)
@@ -172,6 +168,7 @@ def delete_user(user_id):
 
     db.session.delete(user)
     db.session.commit()
+    invalidate_admin_cache(user_id)
     return jsonify({"message": "User deleted successfully"}), 200
 
 
@@ -180,4 +177,10 @@ def delete_user(user_id):
 @jwt_required()
 @admin_required
 def admin_dashboard():
-    return jsonify({"message": "Welcome to the admin dashboard!"}), 200
\ No newline at end of file
+    return jsonify({"message": "Welcome to the admin dashboard!"}), 200
+
+# CLI: `flask users sweep-tokens`, suitable for a periodic cron job
+@bp.cli.command("sweep-tokens")
+def sweep_tokens_command():
+    """Delete expired password reset codes."""
+    print(f"Deleted {sweep_expired_tokens(current_app._get_current_object())} expired token(s)")
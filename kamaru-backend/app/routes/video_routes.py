@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify
-from app import db, jwt
+from app import db, jwt, response_cache
 from app.models.video import Video
 from app.utils.decorators import admin_required
+from app.utils.projection import project, requested_fields, row_serializer
 from flask_jwt_extended import jwt_required, get_jwt_identity
 
 bp = Blueprint("video_routes", __name__)
@@ -26,15 +27,24 @@ def add_video():
     # Save video to database
     video = Video(title=title, youtube_url=youtube_url)
     db.session.add(video)
+    response_cache.invalidate_on_commit(db.session, "videos")
     db.session.commit()
 
     return jsonify({"message": "Video added successfully!", "video": video.to_dict()}), 201
 
 # Get all videos (Public)
 @bp.route("/", methods=["GET"])
+@response_cache.cached("videos")
 def get_videos():
-    videos = Video.query.order_by(Video.uploaded_at.desc()).all()
-    return jsonify({"videos": [video.to_dict() for video in videos]}), 200
+    # ?fields= or ?view=summary selects only those columns; rows skip the ORM entirely
+    try:
+        fields = requested_fields(request.args, Video)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    serialize = row_serializer(Video, fields)
+    videos = project(Video.query.order_by(Video.uploaded_at.desc()), Video, fields).all()
+    return jsonify({"videos": [serialize(video) for video in videos]}), 200
 
 # Delete a video (Admin only)
 @bp.route("/delete/<int:video_id>", methods=["DELETE"])
@@ -47,5 +57,6 @@ def delete_video(video_id):
         return jsonify({"error": "Video not found"}), 404
 
     db.session.delete(video)
+    response_cache.invalidate_on_commit(db.session, "videos")
     db.session.commit()
     return jsonify({"message": "Video deleted successfully!"}), 200
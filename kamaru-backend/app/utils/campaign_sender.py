@@ -0,0 +1,216 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import and_, exists, func, insert, literal, or_, select
+from app import db
+from app.models.newsletter import NewsletterSubscriber, NewsletterCampaign, CampaignDelivery
+from app.utils.email_service import REQUEST_TIMEOUT, get_api, sender_address
+from app.utils.monitoring import monitor
+
+logger = logging.getLogger(__name__)
+
+# Fan-out policy
+RECIPIENTS_PER_CALL = 500  # Brevo messageVersions per API call
+SEND_WORKERS = 4  # Concurrent API calls
+CALLS_PER_SECOND = 5  # Shared rate limit across the workers
+CALL_ATTEMPTS = 3  # Tries per API call within one run
+DELIVERY_ATTEMPTS = 3  # Runs a failed delivery is retried in before its failure is final
+BACKOFF_SECONDS = 2
+# A "sending" campaign without a heartbeat this long can be resumed. The heartbeat
+# is refreshed after every chunk, and one chunk takes at most CALL_ATTEMPTS timed-out
+# calls plus backoff (about 2 minutes), so a live sender is never taken over.
+STALE_AFTER = timedelta(minutes=5)
+
+class SendThrottle:
+    """Spaces calls at least 1/rate seconds apart across threads."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        time.sleep(max(0.0, slot - now))
+
+def retryable_failures(campaign_id):
+    """Condition matching failed deliveries of a campaign that have runs left."""
+    return and_(
+        CampaignDelivery.campaign_id == campaign_id,
+        CampaignDelivery.status == "failed",
+        CampaignDelivery.attempts < DELIVERY_ATTEMPTS,
+    )
+
+def claim_campaign(campaign_id):
+    """Mark a campaign as sending if it is a draft, stalled, or sent with retryable failures.
+
+    Returns False if another sender owns it or there is nothing left to send.
+    """
+    now = datetime.utcnow()
+    claimed = NewsletterCampaign.query.filter(
+        NewsletterCampaign.id == campaign_id,
+        or_(
+            NewsletterCampaign.status == "draft",
+            and_(NewsletterCampaign.status == "sending", NewsletterCampaign.heartbeat_at < now - STALE_AFTER),
+            and_(NewsletterCampaign.status == "sent", exists().where(retryable_failures(campaign_id))),
+        ),
+    ).update(
+        {
+            "status": "sending",
+            "heartbeat_at": now,
+            "started_at": func.coalesce(NewsletterCampaign.started_at, now),
+        },
+        synchronize_session=False,
+    )
+    db.session.commit()
+    return bool(claimed)
+
+def start_campaign(app, campaign_id):
+    """Claim a campaign and fan it out on a background thread."""
+    if not claim_campaign(campaign_id):
+        return False
+    threading.Thread(target=run_campaign, args=(app, campaign_id), name=f"campaign-{campaign_id}", daemon=True).start()
+    return True
+
+def resumable_campaign_ids():
+    """Campaigns whose sender died, and sent campaigns with failed deliveries that have runs left."""
+    now = datetime.utcnow()
+    return [
+        campaign_id
+        for (campaign_id,) in db.session.query(NewsletterCampaign.id).filter(
+            or_(
+                and_(NewsletterCampaign.status == "sending", NewsletterCampaign.heartbeat_at < now - STALE_AFTER),
+                and_(
+                    NewsletterCampaign.status == "sent",
+                    exists().where(retryable_failures(NewsletterCampaign.id)),
+                ),
+            )
+        )
+    ]
+
+def materialize_deliveries(campaign_id):
+    """Create a pending delivery for every subscriber not yet part of the campaign.
+
+    A single INSERT ... SELECT, so it is set-based and safe to re-run on resume.
+    """
+    subscribers = select(
+        literal(campaign_id), NewsletterSubscriber.id, NewsletterSubscriber.email, literal("pending")
+    ).where(
+        ~exists().where(
+            CampaignDelivery.campaign_id == campaign_id,
+            CampaignDelivery.subscriber_id == NewsletterSubscriber.id,
+        )
+    )
+    db.session.execute(
+        insert(CampaignDelivery).from_select(["campaign_id", "subscriber_id", "email", "status"], subscribers)
+    )
+    db.session.commit()
+
+def delivery_counts(campaign_id):
+    rows = (
+        db.session.query(CampaignDelivery.status, func.count(CampaignDelivery.id))
+        .filter(CampaignDelivery.campaign_id == campaign_id)
+        .group_by(CampaignDelivery.status)
+        .all()
+    )
+    return {"pending": 0, "sent": 0, "failed": 0, **dict(rows)}
+
+def campaign_report(campaign):
+    """Campaign details with per-status recipient counts and send throughput.
+
+    "retryable" counts the failed deliveries that a resume will still try again.
+    """
+    counts = delivery_counts(campaign.id)
+    counts["retryable"] = db.session.query(func.count(CampaignDelivery.id)).filter(
+        retryable_failures(campaign.id)
+    ).scalar()
+    throughput = None
+    if campaign.started_at:
+        elapsed = ((campaign.finished_at or datetime.utcnow()) - campaign.started_at).total_seconds()
+        throughput = round(counts["sent"] / elapsed, 2) if elapsed > 0 else None
+    return {**campaign.to_dict(), "recipients": counts, "recipients_per_second": throughput}
+
+def run_campaign(app, campaign_id):
+    """Send every pending delivery of a claimed campaign, in parallel chunks."""
+    with app.app_context():
+        campaign = NewsletterCampaign.query.get(campaign_id)
+        subject, html_content = campaign.subject, campaign.html_content
+        materialize_deliveries(campaign_id)
+
+        # Failures from earlier runs go out again until they reach DELIVERY_ATTEMPTS
+        CampaignDelivery.query.filter(retryable_failures(campaign_id)).update(
+            {"status": "pending"}, synchronize_session=False
+        )
+        db.session.commit()
+
+        api = get_api(app)
+        throttle = SendThrottle(app.config.get("CAMPAIGN_CALLS_PER_SECOND", CALLS_PER_SECOND))
+        base_message = {"sender": sender_address(app), "subject": subject, "htmlContent": html_content}
+
+        def send(recipients):
+            message = {**base_message, "messageVersions": [{"to": [{"email": email}]} for _, email in recipients]}
+            for attempt in range(1, CALL_ATTEMPTS + 1):
+                throttle.wait()
+                try:
+                    with monitor.track_external("brevo"):
+                        api.send_transac_email(message, _request_timeout=REQUEST_TIMEOUT)
+                    return None
+                except Exception as e:
+                    if attempt == CALL_ATTEMPTS:
+                        return str(e)
+                    time.sleep(BACKOFF_SECONDS * 2 ** (attempt - 1))
+
+        last_id = 0
+        started = time.monotonic()
+        sent = 0
+        with ThreadPoolExecutor(max_workers=SEND_WORKERS, thread_name_prefix="campaign-send") as executor:
+            while True:
+                # Keyset pagination over pending deliveries keeps each read short,
+                # rather than pinning one cursor (and transaction) for the whole send.
+                rows = (
+                    db.session.query(CampaignDelivery.id, CampaignDelivery.email)
+                    .filter(
+                        CampaignDelivery.campaign_id == campaign_id,
+                        CampaignDelivery.status == "pending",
+                        CampaignDelivery.id > last_id,
+                    )
+                    .order_by(CampaignDelivery.id)
+                    .limit(RECIPIENTS_PER_CALL * SEND_WORKERS)
+                    .all()
+                )
+                if not rows:
+                    break
+                last_id = rows[-1].id
+
+                chunks = [rows[i:i + RECIPIENTS_PER_CALL] for i in range(0, len(rows), RECIPIENTS_PER_CALL)]
+                for chunk, error in zip(chunks, executor.map(send, chunks)):
+                    # Record each chunk and refresh the heartbeat as soon as its call returns
+                    now = datetime.utcnow()
+                    ids = [delivery_id for delivery_id, _ in chunk]
+                    if error:
+                        values = {"status": "failed", "error": error}
+                    else:
+                        values = {"status": "sent", "sent_at": now, "error": None}
+                        sent += len(chunk)
+                    values["attempts"] = CampaignDelivery.attempts + 1
+                    CampaignDelivery.query.filter(CampaignDelivery.id.in_(ids)).update(
+                        values, synchronize_session=False
+                    )
+                    NewsletterCampaign.query.filter_by(id=campaign_id).update(
+                        {"heartbeat_at": now}, synchronize_session=False
+                    )
+                    db.session.commit()
+
+                logger.info(
+                    "Campaign %s: %d sent, %.1f recipients/s", campaign_id, sent, sent / (time.monotonic() - started)
+                )
+
+        NewsletterCampaign.query.filter_by(id=campaign_id).update(
+            {"status": "sent", "finished_at": datetime.utcnow()}, synchronize_session=False
+        )
+        db.session.commit()
@@ -0,0 +1,120 @@
+import gzip
+import zlib
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; gzip is always available
+    brotli = None
+
+# Only text payloads are worth compressing; images are served by Cloudinary
+COMPRESSIBLE_MIMETYPES = {"application/json", "application/x-ndjson", "text/csv", "text/plain", "text/html"}
+# Streamed bodies (the participant exports) are gzipped chunk by chunk as they are sent
+STREAMED_MIMETYPES = {"application/x-ndjson", "text/csv"}
+
+class Compressor:
+    """gzip/brotli compression of large text responses, negotiated via Accept-Encoding.
+
+    Responses already carrying a Content-Encoding (e.g. cached responses that were
+    compressed once when they were stored) are left alone. Streamed exports are
+    gzipped incrementally, whatever their size, since their length is unknown.
+
+    Config:
+        COMPRESS_ENABLED   set to False to turn compression off
+        COMPRESS_MIN_SIZE  bytes below which responses are sent as-is (default 1024)
+        COMPRESS_LEVEL     gzip level (default 6)
+        COMPRESS_BR_LEVEL  brotli quality (default 5)
+    """
+
+    def __init__(self, app=None):
+        self.enabled = True
+        self.min_size = 1024
+        self.gzip_level = 6
+        self.brotli_level = 5
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("COMPRESS_ENABLED", True)
+        self.min_size = app.config.get("COMPRESS_MIN_SIZE", 1024)
+        self.gzip_level = app.config.get("COMPRESS_LEVEL", 6)
+        self.brotli_level = app.config.get("COMPRESS_BR_LEVEL", 5)
+        app.after_request(self._compress_response)
+
+    @property
+    def encodings(self):
+        """Supported encodings, most preferred first."""
+        return ["br", "gzip"] if brotli else ["gzip"]
+
+    def compress(self, data, encoding):
+        if encoding == "br":
+            return brotli.compress(data, quality=self.brotli_level)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def negotiate(self):
+        """Return the best encoding the client accepts, or None."""
+        accepted = request.accept_encodings
+        candidates = [encoding for encoding in self.encodings if accepted[encoding]]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda encoding: accepted[encoding])
+
+    def should_compress(self, response, size):
+        return (
+            self.enabled
+            and response.mimetype in COMPRESSIBLE_MIMETYPES
+            and size >= self.min_size
+            and "Content-Encoding" not in response.headers
+        )
+
+    def compress_stream(self, chunks):
+        """Gzip an iterable of body chunks without buffering the whole body."""
+        encoder = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode()
+            data = encoder.compress(chunk)
+            if data:
+                yield data
+        yield encoder.flush()
+
+    def apply(self, response, encoding, body):
+        """Swap in an already compressed body and mark the response accordingly."""
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        # A compressed body is a different representation, so its validator is weak
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    def _compress_response(self, response):
+        if response.mimetype in COMPRESSIBLE_MIMETYPES:
+            response.vary.add("Accept-Encoding")
+        if response.status_code != 200 or response.direct_passthrough:
+            return response
+        if response.is_streamed:
+            return self._compress_stream_response(response)
+        if not self.should_compress(response, response.calculate_content_length() or 0):
+            return response
+
+        encoding = self.negotiate()
+        if encoding:
+            self.apply(response, encoding, self.compress(response.get_data(), encoding))
+        return response
+
+    def _compress_stream_response(self, response):
+        if (
+            not self.enabled
+            or response.mimetype not in STREAMED_MIMETYPES
+            or "Content-Encoding" in response.headers
+            or not request.accept_encodings["gzip"]
+        ):
+            return response
+        response.response = self.compress_stream(response.response)
+        response.headers["Content-Encoding"] = "gzip"
+        response.headers.pop("Content-Length", None)
+        return response
+
+compressor = Compressor()
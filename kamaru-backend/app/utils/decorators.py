@@ -1,18 +1,52 @@
+import hmac
 from functools import wraps
-from flask import jsonify
+from flask import current_app, jsonify, request
 from flask_jwt_extended import get_jwt_identity, jwt_required
+from app import response_cache
 from app.models.user import User # Import the User model from app.models.user module to access the User class
+from app.utils.cache import TTLCache
+
+# Cache of JWT identity -> is_admin flag, so admin checks don't query the DB on every request.
+# Entries are keyed by a per-user generation kept in the response cache's store: a role
+# change or deletion bumps it, which reaches every worker when REDIS_URL is set. Without
+# Redis other workers only see the change once the short TTL runs out.
+ADMIN_FLAG_TTL = 5
+admin_flag_cache = TTLCache(maxsize=1024, ttl=ADMIN_FLAG_TTL)
+
+def is_admin(user_id):
+    """Return True if the user exists and is an admin (cached per identity)."""
+    def load():
+        user = User.query.get(user_id)
+        return bool(user and user.is_admin)
+
+    generation = response_cache.backend.generation(f"admin:{user_id}")
+    return admin_flag_cache.get_or_set(f"{user_id}:{generation}", load)
+
+def invalidate_admin_cache(user_id):
+    """Forget the cached admin flag, in every worker, for a user whose role or existence changed."""
+    response_cache.invalidate(f"admin:{user_id}")
 
 def admin_required(f): # Decorator function that takes a function as an argument and returns a new function that checks if the user is an admin
     @wraps(f)
     @jwt_required()
     def decorated_function(*args, **kwargs):
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user or not user.is_admin:
+        if not is_admin(get_jwt_identity()):
             return jsonify({"error": "Admin access required"}), 403
-        
+
         return f(*args, **kwargs)
-    
+
+    return decorated_function
+
+def metrics_access_required(f):
+    """Let a scraper in with `Authorization: Bearer <METRICS_TOKEN>`; anyone else must be an admin."""
+    admin_view = admin_required(f)
+
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        token = current_app.config.get("METRICS_TOKEN")
+        supplied = request.headers.get("Authorization", "").encode()
+        if token and hmac.compare_digest(supplied, f"Bearer {token}".encode()):
+            return f(*args, **kwargs)
+        return admin_view(*args, **kwargs)
+
     return decorated_function
@@ -0,0 +1,7 @@
+from sqlalchemy.dialects import postgresql, sqlite
+from app import db
+
+def conflict_insert(model):
+    """Return an INSERT supporting ON CONFLICT (upserts) for the current database."""
+    dialect = postgresql if db.engine.dialect.name == "postgresql" else sqlite
+    return dialect.insert(model)
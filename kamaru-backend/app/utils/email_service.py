@@ -1,26 +1,183 @@
-import sib_api_v3_sdk
-from sib_api_v3_sdk.rest import ApiException
+import logging
+import threading
+from datetime import datetime, timedelta
 from flask import current_app
+from sqlalchemy import and_, or_
+from app import db
+from app.models.outbox_email import OutboxEmail
+from app.utils.monitoring import monitor
+
+logger = logging.getLogger(__name__)
+
+# Outbox delivery policy
+BATCH_SIZE = 100  # Emails claimed per sender pass
+MAX_VERSIONS_PER_CALL = 500  # Recipients sharing one body, sent in a single API call
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 30  # Retry delay doubles after every failed attempt
+POLL_SECONDS = 15  # How often the sender checks for due retries when idle
+STALE_AFTER = timedelta(minutes=10)  # Emails left "sending" this long are re-queued
+REQUEST_TIMEOUT = (5, 30)  # Connect and read timeouts in seconds for each Brevo API call
+
+_api = None
+_api_lock = threading.Lock()
+_sender = None
+_sender_lock = threading.Lock()
+_wake = threading.Event()
+
+def get_api(app):
+    """Return the process-wide Brevo client, reusing its HTTP connection pool."""
+    global _api
+    import sib_api_v3_sdk  # Imported on first send, keeping it out of worker startup
+    with _api_lock:
+        if _api is None:
+            configuration = sib_api_v3_sdk.Configuration()
+            configuration.api_key['api-key'] = app.config.get("BREVO_API_KEY")
+            if app.config.get("BREVO_API_HOST"):
+                configuration.host = app.config["BREVO_API_HOST"]  # e.g. a local fake Brevo for testing
+            _api = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
+        return _api
+
+def sender_address(app):
+    return {"email": app.config.get("BREVO_SENDER_EMAIL"), "name": "Your App Name"}
 
 def send_email(to_email, subject, content):
     """Send an email using Brevo (Sendinblue) API."""
-    try:
-        configuration = sib_api_v3_sdk.Configuration()
-        configuration.api_key['api-key'] = current_app.config.get("BREVO_API_KEY")
-
-        api_instance = sib_api_v3_sdk.TransactionalEmailsApi(sib_api_v3_sdk.ApiClient(configuration))
-        sender = {"email": current_app.config.get("BREVO_SENDER_EMAIL"), "name": "Your App Name"}
-        recipient = [{"email": to_email}]
+    from sib_api_v3_sdk.rest import ApiException
 
+    app = current_app._get_current_object()
+    try:
         email = {
-            "sender": sender,
-            "to": recipient,
+            "sender": sender_address(app),
+            "to": [{"email": to_email}],
             "subject": subject,
             "htmlContent": content,
         }
 
-        api_instance.send_transac_email(email)
+        with monitor.track_external("brevo"):
+            get_api(app).send_transac_email(email, _request_timeout=REQUEST_TIMEOUT)
         return True
     except ApiException as e:
         print(f"Error sending email: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def queue_email(to_email, subject, content):
+    """Store an email in the outbox and wake the background sender. Returns the row."""
+    email = OutboxEmail(to_email=to_email, subject=subject, html_content=content)
+    db.session.add(email)
+    db.session.commit()
+
+    start_sender(current_app._get_current_object())
+    _wake.set()
+    return email
+
+def start_sender(app):
+    """Start this process's background sender thread if it isn't running yet."""
+    global _sender
+    with _sender_lock:
+        if _sender is None or not _sender.is_alive():
+            _sender = threading.Thread(target=_sender_loop, args=(app,), name="email-sender", daemon=True)
+            _sender.start()
+
+def _sender_loop(app):
+    while True:
+        _wake.clear()
+        try:
+            sent = flush_outbox(app)
+        except Exception:
+            logger.exception("Email outbox pass failed")
+            sent = 0
+        # Keep draining while there is work, otherwise sleep until woken or the next poll
+        if not sent:
+            _wake.wait(POLL_SECONDS)
+
+def claim_due_emails():
+    """Atomically mark up to BATCH_SIZE due emails as "sending" and return them."""
+    now = datetime.utcnow()
+    due = (
+        db.session.query(OutboxEmail.id)
+        .filter(
+            or_(
+                and_(OutboxEmail.status == "pending", OutboxEmail.next_attempt_at <= now),
+                and_(OutboxEmail.status == "sending", OutboxEmail.claimed_at < now - STALE_AFTER),
+            )
+        )
+        .order_by(OutboxEmail.id)
+        .limit(BATCH_SIZE)
+        .with_for_update(skip_locked=True)
+    )
+    ids = [email_id for (email_id,) in due]
+    if not ids:
+        db.session.commit()
+        return []
+
+    OutboxEmail.query.filter(OutboxEmail.id.in_(ids)).update(
+        {"status": "sending", "claimed_at": now}, synchronize_session=False
+    )
+    emails = (
+        db.session.query(
+            OutboxEmail.id, OutboxEmail.to_email, OutboxEmail.subject,
+            OutboxEmail.html_content, OutboxEmail.attempts,
+        )
+        .filter(OutboxEmail.id.in_(ids))
+        .order_by(OutboxEmail.id)
+        .all()
+    )
+    db.session.commit()
+    return emails
+
+def flush_outbox(app):
+    """Send one batch of due emails. Returns how many emails were claimed."""
+    with app.app_context():
+        emails = claim_due_emails()
+        if not emails:
+            return 0
+
+        # Emails with the same subject and body go out as one call with a version per recipient
+        batches = {}
+        for email in emails:
+            batches.setdefault((email.subject, email.html_content), []).append(email)
+
+        api = get_api(app)
+        for (subject, html_content), recipients in batches.items():
+            for start in range(0, len(recipients), MAX_VERSIONS_PER_CALL):
+                _deliver(app, api, subject, html_content, recipients[start:start + MAX_VERSIONS_PER_CALL])
+                db.session.commit()
+        return len(emails)
+
+def _deliver(app, api, subject, html_content, recipients):
+    message = {"sender": sender_address(app), "subject": subject, "htmlContent": html_content}
+    if len(recipients) == 1:
+        message["to"] = [{"email": recipients[0].to_email}]
+    else:
+        message["messageVersions"] = [{"to": [{"email": email.to_email}]} for email in recipients]
+
+    try:
+        with monitor.track_external("brevo"):
+            api.send_transac_email(message, _request_timeout=REQUEST_TIMEOUT)
+    except Exception as e:
+        logger.warning("Sending %d email(s) failed: %s", len(recipients), e)
+        # Schedule retries with exponential backoff, grouped by attempt count
+        ids_by_attempts = {}
+        for email in recipients:
+            ids_by_attempts.setdefault(email.attempts + 1, []).append(email.id)
+        for attempts, ids in ids_by_attempts.items():
+            values = {"attempts": attempts, "last_error": str(e)}
+            if attempts >= MAX_ATTEMPTS:
+                values["status"] = "failed"
+            else:
+                values["status"] = "pending"
+                values["next_attempt_at"] = datetime.utcnow() + timedelta(
+                    seconds=BACKOFF_SECONDS * 2 ** (attempts - 1)
+                )
+            OutboxEmail.query.filter(OutboxEmail.id.in_(ids)).update(values, synchronize_session=False)
+        return
+
+    OutboxEmail.query.filter(OutboxEmail.id.in_([email.id for email in recipients])).update(
+        {
+            "status": "sent",
+            "attempts": OutboxEmail.attempts + 1,
+            "sent_at": datetime.utcnow(),
+            "last_error": None,
+        },
+        synchronize_session=False,
+    )
@@ -0,0 +1,66 @@
+import re
+
+# Responsive sizes generated for every uploaded image: name -> maximum width in pixels
+IMAGE_VARIANTS = {"thumbnail": 320, "medium": 800, "large": 1600}
+
+# Let Cloudinary pick WebP/AVIF per browser and tune the quality of every variant
+DELIVERY_TRANSFORMATION = "f_auto,q_auto"
+
+def variant_transformation(width):
+    # c_limit only ever scales down, so small originals are never blown up
+    return f"c_limit,w_{width}/{DELIVERY_TRANSFORMATION}"
+
+# Passed to the uploader so the variants exist before the first visitor asks for them
+UPLOAD_OPTIONS = {"eager": "|".join(variant_transformation(width) for width in IMAGE_VARIANTS.values())}
+
+def variant_url(secure_url, width):
+    """Insert a resize transformation into a Cloudinary delivery URL."""
+    return secure_url.replace("/upload/", f"/upload/{variant_transformation(width)}/", 1)
+
+def public_id(secure_url):
+    """The Cloudinary public ID of an original upload's delivery URL, or None for other URLs."""
+    if not secure_url or "/upload/" not in secure_url:
+        return None
+    path = re.sub(r"^v\d+/", "", secure_url.split("/upload/", 1)[1])
+    return path.rsplit(".", 1)[0]
+
+def image_fields(secure_url, width=None, height=None):
+    """Return the image columns (URL, dimensions, variants and srcset) for a model.
+
+    Without the original's dimensions the variants carry no sizes and no srcset is
+    built: c_limit leaves a small original at its own width, so a nominal "1600w"
+    could be wrong. URLs not served by Cloudinary get no variants.
+    """
+    fields = {
+        "image_url": secure_url,
+        "image_width": width,
+        "image_height": height,
+        "image_variants": None,
+        "image_srcset": None,
+    }
+    if not secure_url or "/upload/" not in secure_url:
+        return fields
+
+    variants = {}
+    for name, max_width in IMAGE_VARIANTS.items():
+        variant_width = min(max_width, width) if width else None
+        variants[name] = {
+            "url": variant_url(secure_url, max_width),
+            "width": variant_width,
+            "height": round(height * variant_width / width) if width and height else None,
+        }
+    fields["image_variants"] = variants
+    if not width:
+        return fields
+
+    # Variants clamped to the same width would repeat a descriptor, which srcset forbids
+    candidates = {}
+    for variant in variants.values():
+        candidates.setdefault(variant["width"], f"{variant['url']} {variant['width']}w")
+
+    fields["image_srcset"] = ", ".join(candidates.values())
+    return fields
+
+def uploaded_image_fields(upload_result):
+    """image_fields() for a Cloudinary upload result."""
+    return image_fields(upload_result.get("secure_url"), upload_result.get("width"), upload_result.get("height"))
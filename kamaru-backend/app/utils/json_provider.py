@@ -0,0 +1,41 @@
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; Flask's stdlib-based provider is used without it
+    orjson = None
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson, producing the same JSON values as the default one.
+
+    Keys stay sorted and anything orjson can't encode natively (including
+    datetimes, which Flask renders as HTTP dates) goes through the default
+    provider's fallback. Non-ASCII text is sent as UTF-8 rather than \\u escapes.
+    """
+
+    options = orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.options).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        options = self.options
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            options |= orjson.OPT_INDENT_2
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=options) + b"\n", mimetype=self.mimetype
+        )
+
+def init_json(app):
+    """Install the JSON provider selected by JSON_PROVIDER ("orjson" when available, or "default")."""
+    choice = app.config.get("JSON_PROVIDER") or ("orjson" if orjson else "default")
+    if choice == "orjson":
+        if orjson is None:
+            raise RuntimeError("JSON_PROVIDER=orjson requires the orjson package")
+        app.json = OrjsonProvider(app)
+    elif choice != "default":
+        raise RuntimeError(f"Unknown JSON_PROVIDER {choice!r}")
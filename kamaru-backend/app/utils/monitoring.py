@@ -0,0 +1,227 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+logger = logging.getLogger(__name__)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+class Summary:
+    """Running count/sum plus a window of recent samples for p50/p95/p99."""
+
+    def __init__(self, window=1024):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        with self._lock:
+            self._samples.append(value)
+            self.count += 1
+            self.total += value
+
+    def quantiles(self):
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return {q: 0.0 for q in QUANTILES}
+        return {q: samples[min(len(samples) - 1, int(q * len(samples)))] for q in QUANTILES}
+
+class Registry:
+    """Thread-safe store of labelled summaries and counters."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._summaries = {}
+        self._counters = {}
+
+    def summary(self, name, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if key not in self._summaries:
+                self._summaries[key] = Summary()
+            return self._summaries[key]
+
+    def increment(self, name, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+
+    def render(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        def format_labels(labels, **extra):
+            pairs = list(labels) + list(extra.items())
+            if not pairs:
+                return ""
+            return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+        with self._lock:
+            summaries = sorted(self._summaries.items())
+            counters = sorted(self._counters.items())
+
+        lines = []
+        seen = set()
+        for (name, labels), summary in summaries:
+            if name not in seen:
+                lines.append(f"# TYPE {name} summary")
+                seen.add(name)
+            for q, value in summary.quantiles().items():
+                lines.append(f"{name}{format_labels(labels, quantile=q)} {value}")
+            lines.append(f"{name}_count{format_labels(labels)} {summary.count}")
+            lines.append(f"{name}_sum{format_labels(labels)} {summary.total}")
+        for (name, labels), value in counters:
+            if name not in seen:
+                lines.append(f"# TYPE {name} counter")
+                seen.add(name)
+            lines.append(f"{name}{format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+class PoolMetrics:
+    """Counts connection checkouts and how long callers waited for them."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            waits = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "avg_wait_ms": round(self.wait_total / waits * 1000, 3) if waits else 0.0,
+                "max_wait_ms": round(self.wait_max * 1000, 3),
+            }
+
+pool_metrics = PoolMetrics()
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that records checkout wait times in `pool_metrics`."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            pool_metrics.record_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        pool_metrics.record_wait(time.perf_counter() - start)
+        return connection
+
+class RequestMonitor:
+    """Per-request latency and SQL profiling, outbound call timing and a /metrics endpoint.
+
+    Requests slower than SLOW_REQUEST_MS, or issuing more than QUERY_WARN_COUNT
+    statements (a likely N+1), are logged with their slowest statements.
+    """
+
+    def __init__(self, app=None):
+        self.registry = Registry()
+        self.slow_request_ms = 1000
+        self.query_warn_count = 30
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.slow_request_ms = app.config.get("SLOW_REQUEST_MS", 1000)
+        self.query_warn_count = app.config.get("QUERY_WARN_COUNT", 30)
+
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        # Engine listeners are global, so a second app in the process must not add them again
+        if not event.contains(Engine, "before_cursor_execute", self._before_cursor_execute):
+            event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+        # Imported here: decorators loads the User model, which needs the app's db
+        from app.utils.decorators import metrics_access_required
+        app.add_url_rule("/metrics", "metrics", metrics_access_required(self.metrics_view))
+
+    def _start_request(self):
+        g.monitor_start = time.perf_counter()
+        g.monitor_queries = []  # (seconds, statement)
+
+    def _finish_request(self, response):
+        start = g.pop("monitor_start", None)
+        if start is None:
+            return response
+        elapsed = time.perf_counter() - start
+        queries = g.pop("monitor_queries", [])
+        endpoint = request.endpoint or "unmatched"
+        query_time = sum(seconds for seconds, _ in queries)
+
+        self.registry.summary("http_request_duration_seconds", endpoint=endpoint, method=request.method).observe(elapsed)
+        self.registry.summary("db_queries_per_request", endpoint=endpoint).observe(len(queries))
+        self.registry.summary("db_query_seconds_per_request", endpoint=endpoint).observe(query_time)
+        self.registry.increment("http_responses_total", endpoint=endpoint, status=response.status_code)
+
+        if elapsed * 1000 >= self.slow_request_ms or len(queries) > self.query_warn_count:
+            slowest = sorted(queries, key=lambda query: query[0], reverse=True)[:5]
+            logger.warning(
+                "Slow request %s %s: %.1fms, %d queries (%.1fms in SQL). Slowest statements:\n%s",
+                request.method,
+                request.path,
+                elapsed * 1000,
+                len(queries),
+                query_time * 1000,
+                "\n".join(f"  {seconds * 1000:.1f}ms  {statement}" for seconds, statement in slowest),
+            )
+        return response
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("monitor_query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        started = conn.info.get("monitor_query_start")
+        if not started:
+            return
+        elapsed = time.perf_counter() - started.pop()
+        if has_request_context() and "monitor_queries" in g:
+            g.monitor_queries.append((elapsed, statement))
+
+    @contextmanager
+    def track_external(self, service):
+        """Time an outbound call (e.g. Cloudinary, Brevo) and count its failures."""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.registry.increment("external_call_errors_total", service=service)
+            raise
+        finally:
+            self.registry.summary("external_call_duration_seconds", service=service).observe(time.perf_counter() - start)
+
+    def metrics_view(self):
+        """Expose all metrics in the Prometheus text format."""
+        pool = pool_metrics.snapshot()
+        lines = [
+            "# TYPE db_pool_checkouts_total counter",
+            f"db_pool_checkouts_total {pool['checkouts']}",
+            "# TYPE db_pool_checkout_timeouts_total counter",
+            f"db_pool_checkout_timeouts_total {pool['checkout_timeouts']}",
+            "# TYPE db_pool_max_wait_seconds gauge",
+            f"db_pool_max_wait_seconds {pool['max_wait_ms'] / 1000}",
+        ]
+        body = self.registry.render() + "\n".join(lines) + "\n"
+        return Response(body, mimetype="text/plain; version=0.0.4")
+
+monitor = RequestMonitor()
@@ -0,0 +1,150 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import bcrypt
+
+try:
+    import argon2
+    from argon2.exceptions import InvalidHashError, VerificationError
+except ImportError:  # argon2-cffi is optional; bcrypt is always available
+    argon2 = None
+
+logger = logging.getLogger(__name__)
+
+BCRYPT_PREFIXES = ("$2a$", "$2b$", "$2y$")
+ARGON2_PREFIX = "$argon2"
+
+class HasherBusy(Exception):
+    """Raised when too many hash operations are already queued in this process."""
+
+class PasswordHasher:
+    """Hashes and verifies passwords in a dedicated process pool.
+
+    The work runs outside the request threads, so a login burst cannot starve other
+    requests of the GIL, and a bounded semaphore caps how many operations may queue.
+    The scheme (bcrypt or argon2id) and its cost are configurable; stored hashes made
+    with other parameters are upgraded the next time their password is verified.
+
+    Config:
+        PASSWORD_SCHEME           "bcrypt" (default) or "argon2id" (needs argon2-cffi)
+        BCRYPT_LOG_ROUNDS         bcrypt cost factor (default 12)
+        ARGON2_TIME_COST, ARGON2_MEMORY_COST, ARGON2_PARALLELISM
+        PASSWORD_HASH_WORKERS     worker processes per gunicorn worker (default 1); 0 hashes
+                                  on the calling thread
+        PASSWORD_HASH_MAX_PENDING operations allowed in flight before callers wait
+        PASSWORD_HASH_WAIT        seconds to wait for a slot before raising HasherBusy
+    """
+
+    def __init__(self, app=None):
+        self.scheme = "bcrypt"
+        self.bcrypt_rounds = 12
+        self.argon2_hasher = None
+        self.workers = 0
+        self.wait = 10
+        self._slots = threading.BoundedSemaphore(1)
+        self._pool = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.scheme = app.config.get("PASSWORD_SCHEME", "bcrypt")
+        self.bcrypt_rounds = int(app.config.get("BCRYPT_LOG_ROUNDS", 12))
+        if self.scheme == "argon2id":
+            if argon2 is None:
+                raise RuntimeError("PASSWORD_SCHEME=argon2id requires the argon2-cffi package")
+            self.argon2_hasher = argon2.PasswordHasher(
+                time_cost=int(app.config.get("ARGON2_TIME_COST", 3)),
+                memory_cost=int(app.config.get("ARGON2_MEMORY_COST", 65536)),
+                parallelism=int(app.config.get("ARGON2_PARALLELISM", 1)),
+                type=argon2.Type.ID,
+            )
+        elif self.scheme != "bcrypt":
+            raise RuntimeError(f"Unknown PASSWORD_SCHEME {self.scheme!r}")
+
+        self.workers = int(app.config.get("PASSWORD_HASH_WORKERS", 1))
+        self.wait = float(app.config.get("PASSWORD_HASH_WAIT", 10))
+        max_pending = int(app.config.get("PASSWORD_HASH_MAX_PENDING", max(1, self.workers) * 4))
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def _get_pool(self):
+        # Created lazily, and again after a fork, so each gunicorn worker owns its pool
+        with self._pool_lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                # Forking this multi-threaded process directly could copy held locks into the children
+                methods = multiprocessing.get_all_start_methods()
+                context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _discard_pool(self, pool):
+        """Drop a broken pool so the next call builds a fresh one."""
+        with self._pool_lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False)
+
+    def _run(self, fn, *args):
+        """Run a CPU-heavy hashing call, in the pool when one is configured."""
+        if not self._slots.acquire(timeout=self.wait):
+            raise HasherBusy()
+        try:
+            if not self.workers:
+                return fn(*args)
+            pool = self._get_pool()
+            try:
+                return pool.submit(fn, *args).result()
+            except BrokenProcessPool:
+                # A pool process died (e.g. killed for memory); replace the pool and retry once
+                logger.warning("Password hashing pool broke; starting a new one")
+                self._discard_pool(pool)
+                return self._get_pool().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        """Return a new hash of the password using the configured scheme."""
+        if self.scheme == "argon2id":
+            return self._run(self.argon2_hasher.hash, password)
+        # Only module-level bcrypt functions cross the process boundary, so the
+        # workers never have to import the Flask app
+        salt = bcrypt.gensalt(self.bcrypt_rounds)
+        return self._run(bcrypt.hashpw, password.encode("utf-8"), salt).decode("utf-8")
+
+    def needs_rehash(self, password_hash):
+        if self.scheme == "argon2id":
+            return not password_hash.startswith(ARGON2_PREFIX) or self.argon2_hasher.check_needs_rehash(password_hash)
+        if not password_hash.startswith(BCRYPT_PREFIXES):
+            return True
+        return int(password_hash.split("$")[2]) != self.bcrypt_rounds
+
+    def verify(self, password_hash, password):
+        """Check a password against a stored hash of either scheme.
+
+        Returns (valid, new_hash); new_hash is set when the stored hash was made with
+        different parameters and should replace it.
+        """
+        if password_hash.startswith(ARGON2_PREFIX):
+            if argon2 is None:
+                logger.error("Found an argon2 password hash but argon2-cffi is not installed")
+                return False, None
+            try:
+                valid = self._run(argon2.PasswordHasher().verify, password_hash, password)
+            except (VerificationError, InvalidHashError):
+                valid = False
+        else:
+            try:
+                valid = self._run(bcrypt.checkpw, password.encode("utf-8"), password_hash.encode("utf-8"))
+            except ValueError:  # Malformed stored hash
+                valid = False
+
+        if valid and self.needs_rehash(password_hash):
+            return True, self.hash(password)
+        return valid, None
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,54 @@
+from datetime import datetime
+from sqlalchemy import DateTime
+
+VIEWS = ["full", "summary"]
+
+def requested_fields(args, model):
+    """Return the columns chosen by ?fields=a,b or ?view=summary, or every column by default.
+
+    Raises ValueError with a client-facing message on unknown fields or views.
+    """
+    allowed = model.__table__.columns.keys()
+    if args.get("fields"):
+        fields = list(dict.fromkeys(field.strip() for field in args["fields"].split(",") if field.strip()))
+        unknown = [field for field in fields if field not in allowed]
+        if unknown:
+            raise ValueError(f"Invalid fields {unknown}. Choose from {allowed}")
+        return fields
+
+    view = args.get("view", "full")
+    if view not in VIEWS:
+        raise ValueError(f"Invalid view. Choose from {VIEWS}")
+    return list(model.SUMMARY_FIELDS) if view == "summary" else allowed
+
+def project(query, model, fields, keys=("id",)):
+    """Narrow a query to plain rows of `fields`, plus the `keys` the caller needs (e.g. for cursors).
+
+    The extra keys come last, so row_serializer(model, fields) leaves them out of the output.
+    """
+    selected = list(dict.fromkeys([*fields, *keys]))
+    return query.with_entities(*(getattr(model, field) for field in selected))
+
+def format_datetime(value):
+    """Same output as strftime("%Y-%m-%d %H:%M:%S"), several times faster."""
+    return value.replace(tzinfo=None, microsecond=0).isoformat(" ")
+
+def row_serializer(model, fields):
+    """Return a function turning projected row tuples into dicts shaped like the model's to_dict().
+
+    Read-only lists use this instead of building ORM objects: which columns hold
+    datetimes is worked out once, not per row.
+    """
+    datetime_positions = {
+        position for position, field in enumerate(fields)
+        if isinstance(model.__table__.columns[field].type, DateTime)
+    }
+    if not datetime_positions:
+        return lambda row: dict(zip(fields, row))
+
+    def serialize(row):
+        return {
+            field: format_datetime(value) if position in datetime_positions and isinstance(value, datetime) else value
+            for position, (field, value) in enumerate(zip(fields, row))
+        }
+    return serialize
@@ -0,0 +1,141 @@
+import logging
+import math
+import threading
+import time
+from functools import wraps
+from flask import current_app, jsonify, request
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+class MemoryBackend:
+    """Per-process token buckets. With several gunicorn workers each enforces its own limits."""
+
+    def __init__(self, maxsize=10000):
+        self._buckets = TTLCache(maxsize=maxsize)
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, capacity):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key) or (capacity, now)
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            # A bucket that has had time to refill completely is the same as no bucket
+            self._buckets.set(key, (tokens, now), ttl=capacity / rate)
+        return allowed, tokens
+
+# Refill and take one token atomically; returns {allowed, tokens-left-as-string}
+TOKEN_BUCKET_SCRIPT = """
+local rate, capacity, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens, updated = tonumber(bucket[1]), tonumber(bucket[2])
+if tokens == nil then
+  tokens, updated = capacity, now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= 1 then
+  tokens = tokens - 1
+  allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(tokens)}
+"""
+
+class RedisBackend:
+    """Redis-compatible token buckets shared by all workers."""
+
+    def __init__(self, client, prefix="kamaru:ratelimit:"):
+        self.prefix = prefix
+        self._take = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def take(self, key, rate, capacity):
+        allowed, tokens = self._take(keys=[self.prefix + key], args=[rate, capacity, time.time()])
+        return bool(allowed), float(tokens)
+
+class RateLimiter:
+    """Token-bucket throttling for sensitive endpoints, keyed by client IP or a JSON body field.
+
+    Limits are checked before the view runs, so rejected requests cost no database
+    or password-hashing work. Set RATE_LIMIT_ENABLED to False to switch it off
+    (e.g. for load tests), and RATE_LIMIT_PROXY_HOPS to the number of reverse
+    proxies in front of the app so the client IP is read from X-Forwarded-For.
+
+    Limits are shared by all workers only when REDIS_URL is set; otherwise each
+    worker process keeps its own buckets.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.enabled = True
+        self.proxy_hops = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("RATE_LIMIT_ENABLED", True)
+        self.proxy_hops = app.config.get("RATE_LIMIT_PROXY_HOPS", 0)
+        self.backend = MemoryBackend()
+
+        redis_url = app.config.get("REDIS_URL")
+        if redis_url:
+            try:
+                import redis
+                self.backend = RedisBackend(redis.Redis.from_url(redis_url))
+            except ImportError:
+                logger.warning("REDIS_URL is set but the redis package is not installed; rate limits are per worker")
+        if isinstance(self.backend, MemoryBackend) and self.enabled and app.config.get("WEB_CONCURRENCY", 1) > 1:
+            logger.warning(
+                "Rate limits are kept per worker: %s workers each allow the full limit. Set REDIS_URL to share them",
+                app.config["WEB_CONCURRENCY"],
+            )
+
+    def client_ip(self):
+        if self.proxy_hops and len(request.access_route) >= self.proxy_hops:
+            return request.access_route[-self.proxy_hops]
+        return request.remote_addr
+
+    def _keys(self, scope, rules):
+        """Yield (bucket key, rate per second, capacity) for each rule that applies."""
+        for key_type, (count, seconds) in rules.items():
+            if key_type == "ip":
+                value = self.client_ip()
+            else:  # A field of the JSON body, e.g. the email being logged into
+                value = str((request.get_json(silent=True) or {}).get(key_type) or "").strip().lower()
+            if value:
+                yield f"{scope}:{key_type}:{value}", count / seconds, count
+
+    def limit(self, scope, **rules):
+        """Decorator allowing `count` requests per `seconds` for each rule, with bursts up to `count`.
+
+        Rules are keyed by "ip" or by a JSON body field, e.g. ``ip=(10, 60), email=(5, 300)``.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return view(*args, **kwargs)
+
+                retry_after = 0
+                for key, rate, capacity in self._keys(scope, rules):
+                    try:
+                        allowed, tokens = self.backend.take(key, rate, capacity)
+                    except Exception:
+                        # Fail open: an unavailable store must not lock everyone out
+                        logger.exception("Rate limit check failed for %s", key)
+                        continue
+                    if not allowed:
+                        retry_after = max(retry_after, (1 - tokens) / rate)
+
+                if retry_after:
+                    current_app.logger.warning("Rate limited %s from %s", scope, self.client_ip())
+                    response = jsonify({"error": "Too many attempts. Please try again later."})
+                    response.headers["Retry-After"] = str(math.ceil(retry_after))
+                    return response, 429
+                return view(*args, **kwargs)
+            return wrapper
+        return decorator
@@ -0,0 +1,198 @@
+import gzip
+import json
+import logging
+import threading
+import time
+from functools import wraps
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app.utils.cache import TTLCache
+from app.utils.compression import compressor
+
+logger = logging.getLogger(__name__)
+
+# Response headers worth replaying on a cache hit
+CACHED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control")
+
+def pack_entry(meta, body):
+    """Serialize a cached response as a JSON header line followed by the raw body bytes."""
+    return json.dumps(meta).encode() + b"\n" + body
+
+def unpack_entry(entry):
+    meta, _, body = entry.partition(b"\n")
+    return json.loads(meta), body
+
+class MemoryBackend:
+    """Per-process LRU+TTL store. Invalidations only reach the worker that made them."""
+
+    def __init__(self, maxsize=1024):
+        self._entries = TTLCache(maxsize=maxsize)
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def set(self, key, value, ttl):
+        self._entries.set(key, value, ttl)
+
+    def generation(self, group):
+        return self._generations.get(group, 0)
+
+    def bump(self, group):
+        with self._lock:
+            self._generations[group] = self._generations.get(group, 0) + 1
+
+class RedisBackend:
+    """Redis-compatible store shared by all workers, so invalidations apply everywhere."""
+
+    def __init__(self, client, prefix="kamaru:response:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        return self.client.get(self.prefix + key)
+
+    def set(self, key, value, ttl):
+        self.client.set(self.prefix + key, value, ex=ttl)
+
+    def generation(self, group):
+        return int(self.client.get(f"{self.prefix}gen:{group}") or 0)
+
+    def bump(self, group):
+        self.client.incr(f"{self.prefix}gen:{group}")
+
+class ResponseCache:
+    """Caches successful GET responses per endpoint and arguments.
+
+    Views are grouped (e.g. "events"); invalidating a group bumps its
+    generation, which orphans every cached response built from it. Large
+    bodies are stored gzipped, and a brotli copy is added the first time a
+    client asks for br, so a hot payload is compressed once rather than on
+    every hit.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.default_ttl = 300
+        self._metrics = {}
+        self._metrics_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.default_ttl = app.config.get("RESPONSE_CACHE_TTL", 300)
+        self.backend = MemoryBackend(app.config.get("RESPONSE_CACHE_SIZE", 1024))
+
+        redis_url = app.config.get("REDIS_URL")
+        if redis_url:
+            try:
+                import redis
+                self.backend = RedisBackend(redis.Redis.from_url(redis_url))
+            except ImportError:
+                logger.warning("REDIS_URL is set but the redis package is not installed; using in-process cache")
+
+        # Session listeners are global, so a second app in the process must not add them again
+        if not event.contains(Session, "after_commit", self._invalidate_committed):
+            event.listen(Session, "after_commit", self._invalidate_committed)
+            event.listen(Session, "after_rollback", self._discard_rolled_back)
+
+    def _invalidate_committed(self, session):
+        """Apply invalidations queued during a transaction once it commits."""
+        for group in session.info.pop("response_cache_groups", ()):
+            self.invalidate(group)
+
+    def _discard_rolled_back(self, session):
+        session.info.pop("response_cache_groups", None)
+
+    def _record(self, group, outcome):
+        with self._metrics_lock:
+            counts = self._metrics.setdefault(group, {"hits": 0, "misses": 0})
+            counts[outcome] += 1
+
+    def metrics(self):
+        """Return hit/miss counts per group for this process."""
+        with self._metrics_lock:
+            return {group: dict(counts) for group, counts in self._metrics.items()}
+
+    def invalidate(self, *groups):
+        for group in groups:
+            self.backend.bump(group)
+
+    def invalidate_on_commit(self, session, *groups):
+        """Invalidate the groups when the session's current transaction commits."""
+        session.info.setdefault("response_cache_groups", set()).update(groups)
+
+    def expire_within(self, seconds):
+        """Shorten the cache lifetime of the response the current view is building.
+
+        For results that go stale at a known time, e.g. when the next event starts.
+        """
+        g.response_cache_ttl = min(seconds, g.get("response_cache_ttl", seconds))
+
+    def _brotli_body(self, key, expires, plain):
+        """The br copy of a cached gzip body, made on first request and kept as long as the entry."""
+        br_key = key + ":br"
+        body = self.backend.get(br_key)
+        if body is None:
+            body = compressor.compress(plain(), "br")
+            remaining = int(expires - time.time())
+            if remaining >= 1:
+                self.backend.set(br_key, body, remaining)
+        return body
+
+    def _encode(self, response, key, meta, body):
+        """Set a cached body on the response in the encoding the client prefers."""
+        if not meta["encoding"]:
+            response.set_data(body)
+            return response
+        encoding = compressor.negotiate()
+        if encoding == "gzip":
+            return compressor.apply(response, "gzip", body)
+        if encoding == "br":
+            return compressor.apply(response, "br", self._brotli_body(key, meta["expires"], lambda: gzip.decompress(body)))
+        response.set_data(gzip.decompress(body))
+        return response
+
+    def cached(self, group, ttl=None):
+        """Decorator caching a view's 200 responses under the given group."""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                key = "{}:{}:{}:{}:{}".format(
+                    group,
+                    self.backend.generation(group),
+                    request.endpoint,
+                    sorted(kwargs.items()),
+                    sorted(request.args.items(multi=True)),
+                )
+
+                entry = self.backend.get(key)
+                if entry is not None:
+                    self._record(group, "hits")
+                    meta, body = unpack_entry(entry)
+                    response = current_app.response_class(status=meta["status"], headers=meta["headers"])
+                    return self._encode(response, key, meta, body).make_conditional(request)
+
+                self._record(group, "misses")
+                response = current_app.make_response(view(*args, **kwargs))
+                entry_ttl = min(ttl or self.default_ttl, g.pop("response_cache_ttl", float("inf")))
+                if response.status_code == 200 and not response.is_streamed and entry_ttl >= 1:
+                    data = response.get_data()
+                    compress = compressor.should_compress(response, len(data))
+                    body = compressor.compress(data, "gzip") if compress else data
+                    meta = {
+                        "status": response.status_code,
+                        "headers": [(name, response.headers[name]) for name in CACHED_HEADERS if name in response.headers],
+                        "encoding": "gzip" if compress else None,
+                        "expires": time.time() + entry_ttl,
+                    }
+                    self.backend.set(key, pack_entry(meta, body), int(entry_ttl))
+
+                    # Reuse the stored compression for this response too
+                    if compress and compressor.negotiate():
+                        self._encode(response, key, meta, body)
+                return response
+            return wrapper
+        return decorator
@@ -0,0 +1,39 @@
+from sqlalchemy import inspect, text
+from app import db
+
+def upgrade_schema():
+    """Bring an existing database up to the models: missing tables, columns and indexes.
+
+    Only ever adds, so it is safe to run on every deploy. New columns on tables
+    that already hold rows must be nullable or carry a server_default. Returns a
+    description of each change made.
+    """
+    engine = db.engine
+    existing_tables = set(inspect(engine).get_table_names())
+    db.create_all()  # Creates missing tables together with their indexes
+    changes = [f"created table {name}" for name in db.metadata.tables if name not in existing_tables]
+
+    inspector = inspect(engine)
+    compiler = engine.dialect.ddl_compiler(engine.dialect, None)
+    preparer = engine.dialect.identifier_preparer
+    # Postgres also tolerates a concurrent run adding the same column
+    if_not_exists = "IF NOT EXISTS " if engine.dialect.name == "postgresql" else ""
+    with engine.begin() as connection:
+        for table in db.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in columns:
+                    connection.execute(text(
+                        f"ALTER TABLE {preparer.format_table(table)} "
+                        f"ADD COLUMN {if_not_exists}{compiler.get_column_specification(column)}"
+                    ))
+                    changes.append(f"added column {table.name}.{column.name}")
+
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in indexes:
+                    index.create(connection)
+                    changes.append(f"created index {index.name}")
+    return changes
@@ -0,0 +1,35 @@
+import logging
+import threading
+import time
+from app.models.short_token import ShortToken
+
+logger = logging.getLogger(__name__)
+
+SWEEP_INTERVAL_SECONDS = 15 * 60
+
+_sweeper = None
+_sweeper_lock = threading.Lock()
+
+def start_sweeper(app):
+    """Start this process's expired-token sweeper thread if it isn't running yet."""
+    global _sweeper
+    with _sweeper_lock:
+        if _sweeper is None or not _sweeper.is_alive():
+            _sweeper = threading.Thread(target=_sweeper_loop, args=(app,), name="token-sweeper", daemon=True)
+            _sweeper.start()
+
+def sweep_expired_tokens(app):
+    with app.app_context():
+        removed = ShortToken.delete_expired()
+    if removed:
+        logger.info("Deleted %d expired reset token(s)", removed)
+    return removed
+
+def _sweeper_loop(app):
+    interval = app.config.get("TOKEN_SWEEP_INTERVAL", SWEEP_INTERVAL_SECONDS)
+    while True:
+        try:
+            sweep_expired_tokens(app)
+        except Exception:
+            logger.exception("Expired token sweep failed")
+        time.sleep(interval)
@@ -0,0 +1,181 @@
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from app import db
+from app.models.upload_job import UploadJob
+from app.utils.image_variants import UPLOAD_OPTIONS
+from app.utils.monitoring import monitor
+
+logger = logging.getLogger(__name__)
+
+# Retry policy: up to MAX_ATTEMPTS tries, sleeping BACKOFF_SECONDS * 2**n between them
+MAX_ATTEMPTS = 4
+BACKOFF_SECONDS = 2
+
+# Jobs left "running" this long are assumed to belong to a dead worker and are re-queued
+STALE_AFTER = timedelta(minutes=10)
+
+_executor = None
+_executor_lock = threading.Lock()
+_cloudinary_configured = False
+
+# kind -> function(job, upload_result) that applies a finished upload to the database
+_handlers = {}
+
+def upload_handler(kind):
+    """Register the function that applies a finished upload of the given kind."""
+    def register(fn):
+        _handlers[kind] = fn
+        return fn
+    return register
+
+def configure_cloudinary(app):
+    """Import and configure the Cloudinary SDK on first use, keeping it out of worker startup."""
+    global _cloudinary_configured
+    import cloudinary
+    with _executor_lock:
+        if not _cloudinary_configured:
+            cloudinary.config(
+                cloud_name=app.config.get("CLOUDINARY_CLOUD_NAME"),
+                api_key=app.config.get("CLOUDINARY_API_KEY"),
+                api_secret=app.config.get("CLOUDINARY_API_SECRET"),
+            )
+            _cloudinary_configured = True
+
+def cloudinary_uploader(app):
+    configure_cloudinary(app)
+    import cloudinary.uploader
+    return cloudinary.uploader
+
+def get_uploader(app):
+    """Return the upload callable; set app.config["UPLOADER"] to a stub for local testing.
+
+    It is called as uploader(file, **UPLOAD_OPTIONS), like cloudinary.uploader.upload.
+    """
+    return app.config.get("UPLOADER") or cloudinary_uploader(app).upload
+
+def get_resource_lookup(app):
+    """Return the callable reading an uploaded image's details; set app.config["RESOURCE_LOOKUP"] to stub it.
+
+    It is called as lookup(public_id), like cloudinary.api.resource, and returns at least width and height.
+    """
+    if app.config.get("RESOURCE_LOOKUP"):
+        return app.config["RESOURCE_LOOKUP"]
+    configure_cloudinary(app)
+    import cloudinary.api
+    return cloudinary.api.resource
+
+def get_executor(app):
+    """Create the per-process worker pool on first use and resume any unfinished jobs."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=app.config.get("UPLOAD_WORKERS", 4),
+                thread_name_prefix="upload",
+            )
+            _executor.submit(resume_pending_uploads, app)
+        return _executor
+
+def spool_dir(app):
+    path = app.config.get("UPLOAD_SPOOL_DIR") or os.path.join(tempfile.gettempdir(), "kamaru-uploads")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def enqueue_upload(file, kind, target_id=None, payload=None):
+    """Spool an uploaded file to disk, record a job and schedule it. Returns the job."""
+    app = current_app._get_current_object()
+    extension = os.path.splitext(file.filename or "")[1]
+    path = os.path.join(spool_dir(app), f"{uuid.uuid4().hex}{extension}")
+    file.save(path)
+
+    job = UploadJob(kind=kind, target_id=target_id, payload=payload or {}, file_path=path)
+    db.session.add(job)
+    db.session.commit()
+
+    get_executor(app).submit(run_upload_job, app, job.id)
+    return job
+
+def pending_upload_ids(app):
+    """Reset jobs stuck running in a dead worker and return the ids of every pending job."""
+    with app.app_context():
+        stale_before = datetime.now(timezone.utc) - STALE_AFTER
+        UploadJob.query.filter(
+            UploadJob.status == "running", UploadJob.updated_at < stale_before
+        ).update({"status": "pending"})
+        db.session.commit()
+
+        return [job_id for (job_id,) in db.session.query(UploadJob.id).filter_by(status="pending")]
+
+def resume_pending_uploads(app):
+    """Re-queue jobs that were pending or stuck running when a worker last stopped."""
+    job_ids = pending_upload_ids(app)
+    for job_id in job_ids:
+        _executor.submit(run_upload_job, app, job_id)
+    return len(job_ids)
+
+def run_upload_job(app, job_id):
+    """Upload a spooled file with retries, then apply the result via the kind's handler.
+
+    The spooled file is deleted once the job is done or has failed for good.
+    """
+    with app.app_context():
+        # Claim the job atomically so two workers never upload the same file
+        claimed = UploadJob.query.filter_by(id=job_id, status="pending").update(
+            {"status": "running", "updated_at": datetime.now(timezone.utc)}
+        )
+        db.session.commit()
+        if not claimed:
+            return
+
+        job = UploadJob.query.get(job_id)
+        try:
+            _upload_and_apply(app, job)
+        finally:
+            # The spooled copy is kept only while the job can still be resumed
+            if job.status in ("done", "failed"):
+                try:
+                    os.remove(job.file_path)
+                except OSError:
+                    pass
+
+def _upload_and_apply(app, job):
+    """Upload with retries and apply the result, leaving the job done or failed."""
+    uploader = get_uploader(app)
+    result = None
+    while result is None:
+        job.attempts += 1
+        try:
+            with monitor.track_external("cloudinary"):
+                result = uploader(job.file_path, **UPLOAD_OPTIONS)
+        except Exception as e:
+            logger.warning("Upload job %s attempt %s failed: %s", job.id, job.attempts, e)
+            job.error = str(e)
+            job.updated_at = datetime.now(timezone.utc)
+            if job.attempts >= MAX_ATTEMPTS:
+                job.status = "failed"
+                db.session.commit()
+                return
+            db.session.commit()
+            time.sleep(BACKOFF_SECONDS * 2 ** (job.attempts - 1))
+
+    try:
+        _handlers[job.kind](job, result)
+        job.status = "done"
+        job.error = None
+        job.result_url = result.get("secure_url")
+        job.updated_at = datetime.now(timezone.utc)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Upload job %s could not be applied", job.id)
+        job.status = "failed"
+        job.error = str(e)
+        job.updated_at = datetime.now(timezone.utc)
+        db.session.commit()
@@ -0,0 +1,94 @@
+"""Measure password verifications per second, inline versus the hashing process pool.
+
+Run from kamaru-backend/:
+
+    python benchmarks/passwords.py
+    python benchmarks/passwords.py --rounds 10 12 --workers 0 1 2 4 --callers 16
+
+For each setting, --callers threads (standing in for request threads) verify a
+password as fast as they can. Meanwhile a probe thread times a small pure-Python
+task, which shows how much hashing on the request threads slows everything else
+in the worker.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(tempfile.gettempdir(), 'kamaru-bench.sqlite')}")
+
+from app.utils.passwords import PasswordHasher
+
+PASSWORD = "correct horse battery staple"
+
+def probe(stop, samples):
+    """Time a ~1ms slice of pure-Python work until stopped."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        sum(i * i for i in range(20000))
+        samples.append(time.perf_counter() - start)
+        time.sleep(0.005)
+
+def run(rounds, workers, callers, duration):
+    hasher = PasswordHasher(SimpleNamespace(config={
+        "BCRYPT_LOG_ROUNDS": rounds,
+        "PASSWORD_HASH_WORKERS": workers,
+        "PASSWORD_HASH_MAX_PENDING": callers,
+        "PASSWORD_HASH_WAIT": 60,
+    }))
+    stored = hasher.hash(PASSWORD)
+    hasher.verify(stored, PASSWORD)  # Start the pool before timing
+
+    deadline = time.perf_counter() + duration
+    verified = [0] * callers
+
+    def caller(index):
+        while time.perf_counter() < deadline:
+            hasher.verify(stored, PASSWORD)
+            verified[index] += 1
+
+    stop = threading.Event()
+    samples = []
+    probe_thread = threading.Thread(target=probe, args=(stop, samples), daemon=True)
+    probe_thread.start()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=callers) as executor:
+        list(executor.map(caller, range(callers)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    probe_thread.join()
+
+    samples.sort()
+    rate = sum(verified) / elapsed
+    return {
+        "logins_per_second": round(rate, 1),
+        "logins_per_second_per_core": round(rate / (os.cpu_count() or 1), 1),
+        "probe_p95_ms": round(samples[int(0.95 * (len(samples) - 1))] * 1000, 2) if samples else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 12], help="bcrypt cost factors to try")
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, os.cpu_count() or 1],
+                        help="Pool sizes to try; 0 hashes on the calling threads")
+    parser.add_argument("--callers", type=int, default=8, help="Concurrent threads verifying passwords")
+    parser.add_argument("--seconds", type=float, default=5, help="Duration of each run")
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} core(s), {args.callers} concurrent callers, {args.seconds:g}s per run")
+    print(f"{'rounds':>7}{'workers':>9}{'logins/s':>11}{'per core':>10}{'probe p95 ms':>14}")
+    for rounds in args.rounds:
+        for workers in args.workers:
+            result = run(rounds, workers, args.callers, args.seconds)
+            print(
+                f"{rounds:>7}{workers or 'inline':>9}{result['logins_per_second']:>11}"
+                f"{result['logins_per_second_per_core']:>10}{result['probe_p95_ms']:>14}"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app import db
+from app.models.event import Event
+from app.models.gallery import Gallery
+from app.models.newsletter import NewsletterSubscriber
+from app.models.participant import Participant
+from app.models.sys_images import SystemImage
+from app.models.user import User
+from app.models.video import Video
+from app.routes.participant_routes import ALLOWED_CATEGORIES
+
+# Row counts at --scale 1, roughly one festival season of data
+VOLUMES = {
+    "events": 200,
+    "participants": 20000,
+    "gallery": 3000,
+    "videos": 300,
+    "subscribers": 15000,
+    "system_images": 40,
+}
+CHUNK_SIZE = 5000
+
+ADMIN_EMAIL = "bench-admin@example.com"
+USER_EMAIL = "bench-user@example.com"
+PASSWORD = "bench-password"
+
+def _bulk_insert(model, rows):
+    for start in range(0, len(rows), CHUNK_SIZE):
+        db.session.execute(insert(model), rows[start:start + CHUNK_SIZE])
+
+def _image_url(kind, n):
+    return f"https://res.cloudinary.com/bench/image/upload/bench/{kind}-{n}.jpg"
+
+def seed(scale=1.0, random_seed=42):
+    """Drop and recreate every table, then fill them with deterministic fake data.
+
+    Returns the row counts that were inserted.
+    """
+    rng = random.Random(random_seed)
+    counts = {name: max(1, int(volume * scale)) for name, volume in VOLUMES.items()}
+    now = datetime.utcnow()
+
+    db.drop_all()
+    db.create_all()
+
+    admin = User(username="bench-admin", email=ADMIN_EMAIL, is_admin=True)
+    admin.set_password(PASSWORD)
+    user = User(username="bench-user", email=USER_EMAIL)
+    user.set_password(PASSWORD)
+    db.session.add_all([admin, user])
+
+    # Events are spread over two years either side of today
+    _bulk_insert(Event, [
+        {
+            "title": f"Kamaru Challenge Round {n}",
+            "theme": rng.choice(["Heritage", "Unity", "Youth", "Legacy"]),
+            "details": "Traditional music performances and storytelling. " * 10,
+            "date_time": now + timedelta(days=rng.randint(-730, 730), hours=rng.randint(0, 23)),
+            "location": rng.choice(["Nairobi", "Murang'a", "Nyeri", "Nakuru"]),
+            "image_url": _image_url("event", n),
+        }
+        for n in range(counts["events"])
+    ])
+    _bulk_insert(Participant, [
+        {
+            "name": f"Participant {n}",
+            "email": f"participant{n}@example.com",
+            "phone": f"07{n:08d}",
+            "category": rng.choice(ALLOWED_CATEGORIES),
+            "registered_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+        }
+        for n in range(counts["participants"])
+    ])
+    _bulk_insert(Gallery, [
+        {
+            "title": f"Gallery image {n}",
+            "image_url": _image_url("gallery", n),
+            "uploaded_at": now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+        }
+        for n in range(counts["gallery"])
+    ])
+    _bulk_insert(Video, [
+        {"title": f"Performance {n}", "youtube_url": f"https://www.youtube.com/watch?v=bench{n:06d}"}
+        for n in range(counts["videos"])
+    ])
+    _bulk_insert(NewsletterSubscriber, [
+        {"email": f"subscriber{n}@example.com"} for n in range(counts["subscribers"])
+    ])
+    _bulk_insert(SystemImage, [
+        {"section": rng.choice(["banners", "about", "hero"]), "image_url": _image_url("system", n)}
+        for n in range(counts["system_images"])
+    ])
+    db.session.commit()
+    return counts
@@ -0,0 +1,95 @@
+"""Compare ways of turning a participant listing into JSON.
+
+Run from kamaru-backend/:
+
+    python benchmarks/serialization.py
+    python benchmarks/serialization.py --rows 50000 --repeat 5
+
+The pipelines being compared:
+  orm+to_dict+json      ORM objects, Participant.to_dict() and the stdlib json module (the old path)
+  rows+serializer+json  plain row tuples through projection.row_serializer() and stdlib json
+  rows+serializer+app   the same rows through the app's JSON provider (orjson when installed)
+
+Times include the query, so the cost of building ORM objects is counted.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000, help="Participants to seed and serialize")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per pipeline; the median is reported")
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tempfile.gettempdir(), 'kamaru-serialization.sqlite')}"
+    os.environ.setdefault("JWT_SECRET_KEY", "serialization-benchmark-secret-key")
+
+    import logging
+    from app import create_app, db
+    from app.models.participant import Participant
+    from app.utils.projection import project, row_serializer
+    from benchmarks.seed import _bulk_insert
+
+    app = create_app()
+    logging.getLogger().setLevel(logging.WARNING)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        _bulk_insert(Participant, [
+            {
+                "name": f"Participant {n}",
+                "email": f"participant{n}@example.com",
+                "phone": f"07{n:08d}",
+                "category": "Poetry",
+            }
+            for n in range(args.rows)
+        ])
+        db.session.commit()
+
+        fields = Participant.__table__.columns.keys()
+        serialize = row_serializer(Participant, fields)
+
+        def orm_to_dict_json():
+            participants = Participant.query.order_by(Participant.id).all()
+            return json.dumps([p.to_dict() for p in participants], sort_keys=True)
+
+        def rows_json():
+            rows = project(Participant.query.order_by(Participant.id), Participant, fields).all()
+            return json.dumps([serialize(row) for row in rows], sort_keys=True)
+
+        def rows_app_json():
+            rows = project(Participant.query.order_by(Participant.id), Participant, fields).all()
+            return app.json.dumps([serialize(row) for row in rows])
+
+        pipelines = {
+            "orm+to_dict+json": orm_to_dict_json,
+            "rows+serializer+json": rows_json,
+            f"rows+serializer+app ({type(app.json).__name__})": rows_app_json,
+        }
+        # All pipelines must produce the same document
+        outputs = {json.dumps(json.loads(fn()), sort_keys=True) for fn in pipelines.values()}
+        if len(outputs) != 1:
+            sys.exit("Pipelines disagree on the output")
+
+        print(f"{args.rows} participants, median of {args.repeat} runs")
+        baseline = None
+        for name, fn in pipelines.items():
+            timings = []
+            for _ in range(args.repeat):
+                db.session.expunge_all()
+                start = time.perf_counter()
+                fn()
+                timings.append(time.perf_counter() - start)
+            median = statistics.median(timings)
+            baseline = baseline or median
+            print(f"{name:<44}{median * 1000:>9.1f} ms{baseline / median:>8.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+class FakeBrevo:
+    """Local stand-in for the Brevo API that accepts every email after a fixed delay.
+
+    The first `fail_first` calls are answered with a 500, to exercise retries.
+    """
+
+    def __init__(self, latency_ms=50, fail_first=0):
+        self.latency = latency_ms / 1000
+        self.failures_left = fail_first
+        self.calls = 0
+        self.recipients = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    def start(self, host="127.0.0.1", port=0):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                message = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                time.sleep(fake.latency)
+                with fake._lock:
+                    fake.calls += 1
+                    failing = fake.failures_left > 0
+                    if failing:
+                        fake.failures_left -= 1
+                    else:
+                        fake.recipients += len(message.get("messageVersions") or [message])
+                if failing:
+                    status, reply = 500, {"code": "internal_error", "message": "Injected failure"}
+                else:
+                    status, reply = 201, {"messageId": f"<{uuid.uuid4().hex}@bench>"}
+                body = json.dumps(reply).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = False  # Tracked, so stop() can wait for calls in flight
+        threading.Thread(target=self._server.serve_forever, name="fake-brevo", daemon=True).start()
+        return f"http://{host}:{self._server.server_port}/v3"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+def fake_uploader(latency_ms=150):
+    """Return a Cloudinary-shaped upload callable for app.config["UPLOADER"]."""
+    def upload(file, **options):
+        time.sleep(latency_ms / 1000)
+        public_id = f"bench/{uuid.uuid4().hex}"
+        return {
+            "public_id": public_id,
+            "secure_url": f"https://res.cloudinary.com/bench/image/upload/{public_id}.jpg",
+            "width": 1600,
+            "height": 1067,
+        }
+    return upload
@@ -1,21 +1,31 @@
 import os
 from flask import send_from_directory
-# Import the Flask app instance from the app module
-from app import app  
+# Build the Flask app instance with the factory from the app module
+from app import create_app
 
-# Define the root route
-@app.route("/")
-def home():
-    return {"message": "Welcome to Kamaru Backend API"}
+def build_app():
+    app = create_app()
 
-@app.route("/favicon.ico")
-def favicon():
-    """Serve the favicon."""
-    print("ROOT PATH:", app.root_path)
+    # Define the root route
+    @app.route("/")
+    def home():
+        return {"message": "Welcome to Kamaru Backend API"}
 
-    return send_from_directory(
-        os.path.join(app.root_path, "static"), "favicon.ico", mimetype="image/vnd.microsoft.icon"
-        )
+    @app.route("/favicon.ico")
+    def favicon():
+        """Serve the favicon."""
+        print("ROOT PATH:", app.root_path)
+
+        return send_from_directory(
+            os.path.join(app.root_path, "static"), "favicon.ico", mimetype="image/vnd.microsoft.icon"
+            )
+
+    return app
+
+# Password-hashing pool processes re-import this file as __mp_main__ when it is run
+# with `python run.py`; they only need bcrypt, not a second app
+if __name__ != "__mp_main__":
+    app = build_app()
 
 # Ensure the script runs only when executed directly
 if __name__ == "__main__":
@@ -0,0 +1,38 @@
+"""Shared fixtures. Run from kamaru-backend/ with `python -m pytest tests`."""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """An app on a throwaway SQLite database, with password hashing inline and no rate limits."""
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'kamaru-test.sqlite'}")
+    monkeypatch.setenv("JWT_SECRET_KEY", "kamaru-test-secret-key-of-enough-length")
+    monkeypatch.setenv("PASSWORD_HASH_WORKERS", "0")
+    monkeypatch.setenv("RATE_LIMIT_ENABLED", "false")
+
+    from app import create_app, db
+    app = create_app({"TESTING": True})
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
+
+@pytest.fixture
+def admin_headers(app):
+    """Authorization headers of a freshly created admin user."""
+    from flask_jwt_extended import create_access_token
+    from app import db
+    from app.models.user import User
+
+    with app.app_context():
+        admin = User(username="admin", email="admin@example.com", is_admin=True)
+        admin.set_password("admin-password")
+        db.session.add(admin)
+        db.session.commit()
+        return {"Authorization": f"Bearer {create_access_token(identity=str(admin.id))}"}
@@ -0,0 +1,28 @@
+from flask_jwt_extended import create_access_token
+
+from app import db
+from app.models.user import User
+
+def test_demotion_takes_effect_on_the_next_request(app, admin_headers):
+    with app.app_context():
+        other = User(username="other", email="other@example.com", is_admin=True)
+        other.set_password("other-password")
+        db.session.add(other)
+        db.session.commit()
+        other_id = other.id
+        other_headers = {"Authorization": f"Bearer {create_access_token(identity=str(other_id))}"}
+    client = app.test_client()
+
+    # The other admin's flag is now cached
+    assert client.get("/api/users/admin/users", headers=other_headers).status_code == 200
+
+    response = client.put(f"/api/users/admin/users/{other_id}", json={"is_admin": False}, headers=admin_headers)
+    assert response.status_code == 200
+    assert client.get("/api/users/admin/users", headers=other_headers).status_code == 403
+
+    # Promoting again is just as immediate
+    client.put(f"/api/users/admin/users/{other_id}", json={"is_admin": True}, headers=admin_headers)
+    assert client.get("/api/users/admin/users", headers=other_headers).status_code == 200
+
+    client.delete(f"/api/users/admin/users/{other_id}", headers=admin_headers)
+    assert client.get("/api/users/admin/users", headers=other_headers).status_code == 403
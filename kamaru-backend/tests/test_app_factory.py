@@ -0,0 +1,28 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app import create_app, db, response_cache
+from app.models.participant import Participant
+from app.utils.monitoring import monitor
+
+def test_second_app_does_not_register_listeners_again(app):
+    create_app({"TESTING": True})
+
+    assert event.contains(Engine, "before_cursor_execute", monitor._before_cursor_execute)
+    assert event.contains(Session, "after_commit", response_cache._invalidate_committed)
+    with app.app_context():
+        assert len(list(db.engine.dispatch.before_cursor_execute)) == 1
+        assert len(list(db.session().dispatch.after_commit)) == 1
+
+def test_database_uri_override_gets_its_own_engine_options(tmp_path, monkeypatch):
+    # Without DATABASE_URL the environment points at Postgres, whose connect_args SQLite rejects
+    monkeypatch.delenv("DATABASE_URL", raising=False)
+    monkeypatch.setenv("PASSWORD_HASH_WORKERS", "0")
+    override = create_app({"TESTING": True, "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'override.sqlite'}"})
+
+    assert "connect_args" not in override.config["SQLALCHEMY_ENGINE_OPTIONS"]
+    with override.app_context():
+        db.create_all()
+        assert db.session.query(Participant).count() == 0
+        db.engine.dispose()
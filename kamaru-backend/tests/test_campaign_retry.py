@@ -0,0 +1,83 @@
+from app import db
+from app.models.newsletter import CampaignDelivery, NewsletterCampaign, NewsletterSubscriber
+from app.utils import campaign_sender, email_service
+from benchmarks.stubs import FakeBrevo
+
+def test_failed_deliveries_are_retried_up_to_the_cap(app, monkeypatch):
+    monkeypatch.setattr(campaign_sender, "BACKOFF_SECONDS", 0)
+    monkeypatch.setattr(email_service, "_api", None)
+    # Every call of the first two runs fails
+    fake = FakeBrevo(latency_ms=0, fail_first=2 * campaign_sender.CALL_ATTEMPTS)
+    app.config.update(BREVO_API_HOST=fake.start(), BREVO_API_KEY="test-key", BREVO_SENDER_EMAIL="noreply@example.com")
+    monkeypatch.setattr(campaign_sender, "DELIVERY_ATTEMPTS", 3)
+
+    try:
+        with app.app_context():
+            db.session.add_all(NewsletterSubscriber(email=f"s{n}@example.com") for n in range(3))
+            campaign = NewsletterCampaign(subject="News", html_content="<p>News</p>")
+            db.session.add(campaign)
+            db.session.commit()
+            campaign_id = campaign.id
+
+            def run():
+                assert campaign_sender.claim_campaign(campaign_id)
+                campaign_sender.run_campaign(app, campaign_id)
+                return campaign_sender.campaign_report(db.session.get(NewsletterCampaign, campaign_id))["recipients"]
+
+            assert run() == {"pending": 0, "sent": 0, "failed": 3, "retryable": 3}
+            assert campaign_sender.resumable_campaign_ids() == [campaign_id]
+            assert run() == {"pending": 0, "sent": 0, "failed": 3, "retryable": 3}
+            assert run() == {"pending": 0, "sent": 3, "failed": 0, "retryable": 0}
+            assert {delivery.attempts for delivery in CampaignDelivery.query} == {3}
+
+            # Nothing left to send, so the campaign cannot be claimed again
+            assert campaign_sender.resumable_campaign_ids() == []
+            assert not campaign_sender.claim_campaign(campaign_id)
+    finally:
+        fake.stop()
+
+def test_failures_are_final_after_the_cap(app, monkeypatch):
+    monkeypatch.setattr(campaign_sender, "BACKOFF_SECONDS", 0)
+    monkeypatch.setattr(campaign_sender, "DELIVERY_ATTEMPTS", 2)
+    monkeypatch.setattr(email_service, "_api", None)
+    fake = FakeBrevo(latency_ms=0, fail_first=100)
+    app.config.update(BREVO_API_HOST=fake.start(), BREVO_API_KEY="test-key", BREVO_SENDER_EMAIL="noreply@example.com")
+
+    try:
+        with app.app_context():
+            db.session.add(NewsletterSubscriber(email="s@example.com"))
+            campaign = NewsletterCampaign(subject="News", html_content="<p>News</p>")
+            db.session.add(campaign)
+            db.session.commit()
+
+            for _ in range(2):
+                assert campaign_sender.claim_campaign(campaign.id)
+                campaign_sender.run_campaign(app, campaign.id)
+
+            assert not campaign_sender.claim_campaign(campaign.id)
+            report = campaign_sender.campaign_report(db.session.get(NewsletterCampaign, campaign.id))
+            assert report["recipients"] == {"pending": 0, "sent": 0, "failed": 1, "retryable": 0}
+    finally:
+        fake.stop()
+
+def test_hung_brevo_calls_time_out(app, monkeypatch):
+    monkeypatch.setattr(campaign_sender, "BACKOFF_SECONDS", 0)
+    monkeypatch.setattr(campaign_sender, "REQUEST_TIMEOUT", (1, 0.2))
+    monkeypatch.setattr(email_service, "_api", None)
+    fake = FakeBrevo(latency_ms=1000)
+    app.config.update(BREVO_API_HOST=fake.start(), BREVO_API_KEY="test-key", BREVO_SENDER_EMAIL="noreply@example.com")
+
+    try:
+        with app.app_context():
+            db.session.add_all(NewsletterSubscriber(email=f"s{n}@example.com") for n in range(2))
+            campaign = NewsletterCampaign(subject="News", html_content="<p>News</p>")
+            db.session.add(campaign)
+            db.session.commit()
+            assert campaign_sender.claim_campaign(campaign.id)
+            campaign_sender.run_campaign(app, campaign.id)
+
+            report = campaign_sender.campaign_report(db.session.get(NewsletterCampaign, campaign.id))
+            assert report["recipients"]["failed"] == 2
+            assert "timed out" in CampaignDelivery.query.first().error.lower()
+    finally:
+        fake.stop()
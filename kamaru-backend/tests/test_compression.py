@@ -0,0 +1,52 @@
+import csv
+import gzip
+import io
+from datetime import datetime, timedelta
+
+from app import db, response_cache
+from app.models.event import Event
+from app.models.participant import Participant
+
+def test_cached_response_stores_one_gzip_body(app):
+    with app.app_context():
+        for day in range(20):
+            db.session.add(Event(
+                title=f"Event {day}", theme="Theme", details="Details " * 50,
+                date_time=datetime(2030, 1, 1) + timedelta(days=day),
+                location="Nairobi", image_url="https://example.com/event.jpg",
+            ))
+        db.session.commit()
+
+    client = app.test_client()
+    compressed = client.get("/api/events/", headers={"Accept-Encoding": "gzip"})
+    plain = client.get("/api/events/")
+
+    assert compressed.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(compressed.data) == plain.data
+    assert "Content-Encoding" not in plain.headers
+    assert len(plain.get_json()) == 20
+
+    # The entry holds the gzip body only, far smaller than the JSON it replays
+    (entry,) = [value for _, value in response_cache.backend._entries._data.values()]
+    assert len(entry) < len(plain.data) / 2
+
+def test_streamed_export_is_gzipped_when_accepted(app, admin_headers):
+    headers = admin_headers
+    with app.app_context():
+        for number in range(200):
+            db.session.add(Participant(
+                name=f"Runner {number}", email=f"runner{number}@example.com",
+                phone=f"0700{number:06d}", category="5km",
+            ))
+        db.session.commit()
+
+    client = app.test_client()
+    # Each streamed body is read before the next request, while its request context is current
+    response = client.get("/api/participants/export?format=csv", headers={**headers, "Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    exported = gzip.decompress(response.data)
+
+    plain = client.get("/api/participants/export?format=csv", headers=headers)
+    assert "Content-Encoding" not in plain.headers
+    assert exported == plain.data
+    assert len(list(csv.DictReader(io.StringIO(plain.data.decode())))) == 200
@@ -0,0 +1,87 @@
+from datetime import datetime
+
+import pytest
+
+from app import db
+from app.models.outbox_email import OutboxEmail
+from app.utils import email_service
+from benchmarks.stubs import FakeBrevo
+
+@pytest.fixture
+def brevo(app, monkeypatch):
+    """Start a fake Brevo and point a fresh API client at it."""
+    def start(fail_first=0):
+        fake = FakeBrevo(latency_ms=0, fail_first=fail_first)
+        app.config["BREVO_API_HOST"] = fake.start()
+        app.config["BREVO_API_KEY"] = "test-key"
+        app.config["BREVO_SENDER_EMAIL"] = "noreply@example.com"
+        monkeypatch.setattr(email_service, "_api", None)
+        started.append(fake)
+        return fake
+
+    started = []
+    yield start
+    for fake in started:
+        fake.stop()
+
+def queue(app, *recipients, subject="Hello", content="<p>Hi</p>"):
+    with app.app_context():
+        db.session.add_all(OutboxEmail(to_email=to, subject=subject, html_content=content) for to in recipients)
+        db.session.commit()
+
+def outbox(app):
+    with app.app_context():
+        return {
+            email.to_email: (email.status, email.attempts, email.last_error, email.next_attempt_at)
+            for email in OutboxEmail.query.order_by(OutboxEmail.id)
+        }
+
+def make_due(app):
+    with app.app_context():
+        OutboxEmail.query.update({"next_attempt_at": datetime.utcnow()})
+        db.session.commit()
+
+def test_identical_emails_go_out_in_one_call(app, brevo):
+    fake = brevo()
+    queue(app, "a@example.com", "b@example.com")
+    queue(app, "c@example.com", subject="Other")
+
+    assert email_service.flush_outbox(app) == 3
+
+    assert fake.calls == 2
+    assert fake.recipients == 3
+    assert {status for status, *_ in outbox(app).values()} == {"sent"}
+    assert email_service.flush_outbox(app) == 0
+
+def test_failed_send_is_retried_after_backoff(app, brevo):
+    fake = brevo(fail_first=1)
+    queue(app, "a@example.com", "b@example.com")
+
+    assert email_service.flush_outbox(app) == 2
+    for status, attempts, last_error, next_attempt_at in outbox(app).values():
+        assert (status, attempts) == ("pending", 1)
+        assert last_error
+        assert next_attempt_at > datetime.utcnow()
+
+    # Not due yet, so nothing is claimed
+    assert email_service.flush_outbox(app) == 0
+
+    make_due(app)
+    assert email_service.flush_outbox(app) == 2
+    assert fake.calls == 2
+    for status, attempts, last_error, _ in outbox(app).values():
+        assert (status, attempts, last_error) == ("sent", 2, None)
+
+def test_email_fails_after_max_attempts(app, brevo):
+    brevo(fail_first=email_service.MAX_ATTEMPTS)
+    queue(app, "a@example.com")
+
+    for _ in range(email_service.MAX_ATTEMPTS):
+        make_due(app)
+        assert email_service.flush_outbox(app) == 1
+
+    status, attempts, last_error, _ = outbox(app)["a@example.com"]
+    assert (status, attempts) == ("failed", email_service.MAX_ATTEMPTS)
+    assert last_error
+    make_due(app)
+    assert email_service.flush_outbox(app) == 0
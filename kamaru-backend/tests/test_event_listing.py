@@ -0,0 +1,26 @@
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from app import db
+from app.models.event import Event
+
+def add_event(title, date_time):
+    db.session.add(Event(
+        title=title, theme="Theme", details="Details", date_time=date_time,
+        location="Nairobi", image_url="https://example.com/event.jpg",
+    ))
+
+def test_upcoming_and_past_use_the_event_timezone(app):
+    # Nairobi is UTC+3: an event an hour ago local time is still ahead of UTC wall-clock time
+    local_now = datetime.now(ZoneInfo("Africa/Nairobi")).replace(tzinfo=None)
+    with app.app_context():
+        add_event("Earlier today", local_now - timedelta(hours=1))
+        add_event("Later today", local_now + timedelta(hours=1))
+        db.session.commit()
+
+    client = app.test_client()
+    upcoming = client.get("/api/events/?when=upcoming&fields=title").get_json()["events"]
+    past = client.get("/api/events/?when=past&fields=title").get_json()["events"]
+
+    assert [event["title"] for event in upcoming] == ["Later today"]
+    assert [event["title"] for event in past] == ["Earlier today"]
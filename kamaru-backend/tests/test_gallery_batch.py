@@ -0,0 +1,43 @@
+import io
+
+from app.models.gallery import Gallery
+from app.routes.gallery_routes import MAX_BATCH_FILES
+
+def stub_uploader(file, **options):
+    """Stands in for cloudinary.uploader.upload; files whose content is b"bad" fail."""
+    content = file.read()
+    if content == b"bad":
+        raise RuntimeError("Upload rejected")
+    name = content.decode()
+    return {"secure_url": f"https://res.cloudinary.com/kamaru/image/upload/v1/{name}.jpg", "width": 1200, "height": 800}
+
+def post_batch(app, headers, contents):
+    data = {"title": "Race day", "images": [(io.BytesIO(content), f"photo{n}.jpg") for n, content in enumerate(contents)]}
+    return app.test_client().post(
+        "/api/gallery/upload/batch", data=data, content_type="multipart/form-data",
+        headers=headers,
+    )
+
+def test_batch_upload_outcomes(app, admin_headers):
+    app.config["UPLOADER"] = stub_uploader
+
+    created = post_batch(app, admin_headers, [b"one", b"two"])
+    assert created.status_code == 201
+    assert created.get_json()["uploaded"] == 2
+
+    partial = post_batch(app, admin_headers, [b"three", b"bad"])
+    assert partial.status_code == 207
+    assert [result["status"] for result in partial.get_json()["results"]] == ["uploaded", "failed"]
+
+    failed = post_batch(app, admin_headers, [b"bad", b"bad"])
+    assert failed.status_code == 502
+    assert failed.get_json()["uploaded"] == 0
+
+    with app.app_context():
+        assert sorted(image.image_url.rsplit("/", 1)[1] for image in Gallery.query) == ["one.jpg", "three.jpg", "two.jpg"]
+        assert Gallery.query.first().image_srcset
+
+def test_batch_upload_is_capped(app, admin_headers):
+    app.config["UPLOADER"] = stub_uploader
+    response = post_batch(app, admin_headers, [b"x"] * (MAX_BATCH_FILES + 1))
+    assert response.status_code == 400
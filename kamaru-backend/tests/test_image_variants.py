@@ -0,0 +1,51 @@
+from datetime import datetime
+
+from app import db
+from app.models.event import Event
+from app.utils.image_variants import image_fields, public_id
+
+URL = "https://res.cloudinary.com/kamaru/image/upload/v1712345678/events/race.jpg"
+
+def test_unknown_dimensions_give_no_srcset():
+    fields = image_fields(URL)
+    assert fields["image_srcset"] is None
+    assert all(variant["width"] is None for variant in fields["image_variants"].values())
+
+def test_small_original_is_not_advertised_wider_than_it_is():
+    fields = image_fields(URL, 1000, 500)
+    assert fields["image_srcset"].endswith(" 1000w")
+    assert fields["image_variants"]["large"] == {
+        "url": URL.replace("/upload/", "/upload/c_limit,w_1600/f_auto,q_auto/"), "width": 1000, "height": 500,
+    }
+
+def test_public_id():
+    assert public_id(URL) == "events/race"
+    assert public_id("https://example.com/race.jpg") is None
+
+def test_backfill_reads_dimensions_from_cloudinary(app):
+    looked_up = []
+
+    def lookup(image_id):
+        looked_up.append(image_id)
+        if image_id == "events/missing":
+            raise RuntimeError("Resource not found")
+        return {"width": 1000, "height": 500}
+
+    app.config["RESOURCE_LOOKUP"] = lookup
+    with app.app_context():
+        for name in ("race", "missing"):
+            db.session.add(Event(
+                title=name, theme="Theme", details="Details", date_time=datetime(2030, 1, 1), location="Nairobi",
+                image_url=URL.replace("race", name),
+            ))
+        db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=["uploads", "backfill-variants"])
+    assert "Event: added variants to 1 image(s), skipped 1" in result.output
+    assert looked_up == ["events/race", "events/missing"]
+
+    with app.app_context():
+        race = Event.query.filter_by(title="race").one()
+        assert (race.image_width, race.image_height) == (1000, 500)
+        assert race.image_srcset.endswith(" 1000w")
+        assert Event.query.filter_by(title="missing").one().image_srcset is None
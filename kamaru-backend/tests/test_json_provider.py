@@ -0,0 +1,42 @@
+import json
+import uuid
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+from app.utils.json_provider import OrjsonProvider
+
+PAYLOAD = {
+    "zeta": 1,
+    "alpha": {
+        "registered_at": datetime(2030, 1, 1, 12, 30, tzinfo=timezone.utc),
+        "naive": datetime(2030, 1, 1, 12, 30),
+        "day": date(2030, 1, 1),
+        "fee": Decimal("12.50"),
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    },
+    "name": "Kamaru Challenge — Nyeri",
+    "items": [3, 1, 2],
+}
+
+def test_orjson_matches_the_default_provider(app):
+    fast = OrjsonProvider(app).dumps(PAYLOAD)
+    default = DefaultJSONProvider(app).dumps(PAYLOAD)
+
+    assert json.loads(fast) == json.loads(default)
+    assert json.loads(fast)["alpha"]["registered_at"] == "Tue, 01 Jan 2030 12:30:00 GMT"
+    assert json.loads(fast)["alpha"]["fee"] == "12.50"
+    # Keys are sorted at every level, as with the default provider's sort_keys
+    assert list(json.loads(fast)) == ["alpha", "items", "name", "zeta"]
+    assert list(json.loads(fast)["alpha"]) == list(json.loads(default)["alpha"])
+
+def test_orjson_is_the_installed_provider(app):
+    assert isinstance(app.json, OrjsonProvider)
+    with app.test_request_context():
+        response = app.json.response(PAYLOAD)
+    assert json.loads(response.get_data()) == json.loads(DefaultJSONProvider(app).dumps(PAYLOAD))
+
+def test_default_provider_opt_out(app):
+    from app import create_app
+    assert type(create_app({"JSON_PROVIDER": "default"}).json) is DefaultJSONProvider
@@ -0,0 +1,61 @@
+import io
+
+import openpyxl
+
+from app import db
+from app.models.participant import Participant
+
+HEADER = ["Name", "Email", "Phone", "Category"]
+ROWS = [
+    ["Amina", "amina@example.com", "0712000001", "Poetry"],
+    ["Baraka", "baraka@example.com", "0712000002", "Dance"],  # Invalid category
+    ["Amina Again", "amina@example.com", "0712000003", "Poetry"],  # Duplicate within the file
+    ["Chebet", "taken@example.com", "0712000004", "Rendition"],  # Already registered
+    ["Daudi", "daudi@example.com", "0712000005", "Folk Songs"],
+]
+
+def csv_file():
+    lines = [",".join(HEADER)] + [",".join(row) for row in ROWS]
+    return io.BytesIO("\n".join(lines).encode()), "participants.csv"
+
+def xlsx_file():
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.append(HEADER)
+    for row in ROWS:
+        sheet.append(row)
+    # A phone typed as a number keeps its leading zero through a zero-padded format
+    sheet["C6"] = 712000005
+    sheet["C6"].number_format = "0000000000"
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    buffer.seek(0)
+    return buffer, "participants.xlsx"
+
+def run_import(app, admin_headers, file):
+    with app.app_context():
+        db.session.add(Participant(name="Taken", email="taken@example.com", phone="0799999999", category="Poetry"))
+        db.session.commit()
+    return app.test_client().post(
+        "/api/participants/import", data={"file": file}, content_type="multipart/form-data", headers=admin_headers,
+    )
+
+def check_report(app, response):
+    assert response.status_code == 200
+    body = response.get_json()
+    assert (body["inserted"], body["failed"]) == (2, 3)
+    assert [(row["row"], row["status"]) for row in body["rows"]] == [
+        (2, "inserted"), (3, "error"), (4, "error"), (5, "error"), (6, "inserted"),
+    ]
+    errors = {row["row"]: row["error"] for row in body["rows"] if row["status"] == "error"}
+    assert errors[3].startswith("Invalid category")
+    assert errors[4] == "Duplicate email or phone within the file"
+    assert errors[5] == "Email or phone already registered"
+    with app.app_context():
+        assert Participant.query.filter_by(email="daudi@example.com").one().phone == "0712000005"
+
+def test_csv_import(app, admin_headers):
+    check_report(app, run_import(app, admin_headers, csv_file()))
+
+def test_xlsx_import(app, admin_headers):
+    check_report(app, run_import(app, admin_headers, xlsx_file()))
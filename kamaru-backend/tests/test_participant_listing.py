@@ -0,0 +1,27 @@
+from app import db
+from app.models.participant import Participant
+
+def test_keyset_pages_and_headers(app, admin_headers):
+    with app.app_context():
+        db.session.add_all(
+            Participant(name=f"Runner {n}", email=f"runner{n}@example.com", phone=f"0700{n:06d}", category="Poetry")
+            for n in range(5)
+        )
+        db.session.commit()
+    client = app.test_client()
+
+    first = client.get("/api/participants/?limit=2", headers={**admin_headers, "Origin": "https://kamaruchallenge.africa"})
+    assert [p["name"] for p in first.get_json()] == ["Runner 0", "Runner 1"]
+    assert first.headers["X-Total-Count"] == "5"
+    # Cross-origin JavaScript may only read headers the CORS policy exposes
+    exposed = {name.strip() for name in first.headers["Access-Control-Expose-Headers"].split(",")}
+    assert {"X-Total-Count", "X-Next-After-Id"} <= exposed
+
+    after_id = first.headers["X-Next-After-Id"]
+    second = client.get(f"/api/participants/?limit=2&after_id={after_id}", headers=admin_headers)
+    assert [p["name"] for p in second.get_json()] == ["Runner 2", "Runner 3"]
+    assert "X-Total-Count" not in second.headers
+
+    last = client.get(f"/api/participants/?limit=2&after_id={second.headers['X-Next-After-Id']}", headers=admin_headers)
+    assert [p["name"] for p in last.get_json()] == ["Runner 4"]
+    assert "X-Next-After-Id" not in last.headers
@@ -0,0 +1,66 @@
+import bcrypt
+
+from app import db, password_hasher
+from app.models.user import User
+
+def add_user(app, password, rounds):
+    with app.app_context():
+        user = User(username="runner", email="runner@example.com",
+                    password_hash=bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode())
+        db.session.add(user)
+        db.session.commit()
+
+def login(app, password):
+    return app.test_client().post("/api/users/login", json={"email": "runner@example.com", "password": password})
+
+def stored_rounds(app):
+    with app.app_context():
+        return int(User.query.one().password_hash.split("$")[2])
+
+def test_login_verifies_the_password(app):
+    app.config["BCRYPT_LOG_ROUNDS"] = 4
+    password_hasher.init_app(app)
+    add_user(app, "correct horse", rounds=4)
+
+    assert login(app, "correct horse").status_code == 200
+    assert login(app, "wrong horse").status_code == 401
+
+def test_login_upgrades_a_hash_with_old_parameters(app):
+    app.config["BCRYPT_LOG_ROUNDS"] = 5
+    password_hasher.init_app(app)
+    add_user(app, "correct horse", rounds=4)
+
+    assert login(app, "wrong horse").status_code == 401
+    assert stored_rounds(app) == 4
+    assert login(app, "correct horse").status_code == 200
+    assert stored_rounds(app) == 5
+    assert login(app, "correct horse").status_code == 200
+
+def test_busy_hasher_answers_503(app):
+    app.config.update(BCRYPT_LOG_ROUNDS=4, PASSWORD_HASH_MAX_PENDING=1, PASSWORD_HASH_WAIT=0)
+    password_hasher.init_app(app)
+    add_user(app, "correct horse", rounds=4)
+
+    password_hasher._slots.acquire()  # Another request is hashing
+    try:
+        response = login(app, "correct horse")
+    finally:
+        password_hasher._slots.release()
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+def test_broken_pool_is_replaced(app):
+    app.config.update(BCRYPT_LOG_ROUNDS=4, PASSWORD_HASH_WORKERS=1)
+    password_hasher.init_app(app)
+    try:
+        assert password_hasher.verify(password_hasher.hash("secret"), "secret") == (True, None)
+        broken = password_hasher._pool
+        for process in list(broken._processes.values()):
+            process.kill()
+            process.join()
+
+        assert password_hasher.verify(password_hasher.hash("secret"), "secret") == (True, None)
+        assert password_hasher._pool is not broken
+    finally:
+        password_hasher._pool.shutdown()
+        password_hasher._pool = None
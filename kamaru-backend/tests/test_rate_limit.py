@@ -0,0 +1,17 @@
+from app import rate_limiter
+
+def forgot_password(client, ip, number):
+    return client.post(
+        "/api/users/forgot_password",
+        json={"email": f"nobody{number}@example.com"},
+        headers={"X-Forwarded-For": ip},
+    )
+
+def test_clients_behind_the_proxy_get_separate_buckets(app):
+    app.config.update(RATE_LIMIT_ENABLED=True, RATE_LIMIT_PROXY_HOPS=1)
+    rate_limiter.init_app(app)
+    client = app.test_client()
+
+    # forgot_password allows 5 requests per IP in 5 minutes
+    assert [forgot_password(client, "203.0.113.7", n).status_code for n in range(6)] == [404] * 5 + [429]
+    assert forgot_password(client, "198.51.100.23", 6).status_code == 404
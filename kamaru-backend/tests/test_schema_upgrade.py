@@ -0,0 +1,30 @@
+from sqlalchemy import inspect, text
+
+from app import db
+
+def test_upgrade_schema_adds_missing_columns_and_indexes(app):
+    # Roll the database back to before the delivery attempts and event image columns existed
+    with app.app_context():
+        with db.engine.begin() as connection:
+            connection.execute(text("DROP INDEX ix_event_date_time_id"))
+            for column in ("image_width", "image_height", "image_variants", "image_srcset"):
+                connection.execute(text(f"ALTER TABLE event DROP COLUMN {column}"))
+            connection.execute(text("ALTER TABLE campaign_deliveries DROP COLUMN attempts"))
+            connection.execute(text("INSERT INTO newsletter_campaigns (subject, html_content, status) VALUES ('News', '<p>News</p>', 'sent')"))
+            connection.execute(text(
+                "INSERT INTO campaign_deliveries (campaign_id, subscriber_id, email, status) "
+                "VALUES (1, 1, 'reader@example.com', 'failed')"
+            ))
+
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["upgrade-schema"])
+    assert "added column campaign_deliveries.attempts" in result.output
+    assert "added column event.image_srcset" in result.output
+    assert "created index ix_event_date_time_id" in result.output
+
+    with app.app_context():
+        assert db.session.execute(text("SELECT attempts FROM campaign_deliveries")).scalar() == 0
+        assert "ix_event_date_time_id" in {index["name"] for index in inspect(db.engine).get_indexes("event")}
+
+    # A second run finds nothing to do
+    assert "(0 change(s))" in runner.invoke(args=["upgrade-schema"]).output
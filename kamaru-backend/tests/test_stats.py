@@ -0,0 +1,30 @@
+from datetime import datetime
+
+from app import db
+from app.models.event import Event
+from app.routes import stat_routes
+
+def add_event(title):
+    db.session.add(Event(
+        title=title, theme="Theme", details="Details", date_time=datetime(2030, 1, 1),
+        location="Nairobi", image_url="https://example.com/event.jpg",
+    ))
+    db.session.commit()
+
+def test_stats_are_counted_and_cached(app):
+    stat_routes.site_stats_cache.clear()
+    client = app.test_client()
+    with app.app_context():
+        add_event("First")
+
+    stats = client.get("/api/stats/").get_json()
+    assert stats == {
+        "total_events": 1, "total_participants": 0, "total_users": 0, "total_videos": 0, "total_gallery_items": 0,
+    }
+
+    # Served from the cache until it expires
+    with app.app_context():
+        add_event("Second")
+    assert client.get("/api/stats/").get_json()["total_events"] == 1
+    stat_routes.site_stats_cache.clear()
+    assert client.get("/api/stats/").get_json()["total_events"] == 2
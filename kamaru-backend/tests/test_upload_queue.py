@@ -0,0 +1,71 @@
+import os
+
+import pytest
+
+from app import db
+from app.models.gallery import Gallery
+from app.models.upload_job import UploadJob
+from app.utils import upload_queue
+
+class StubUploader:
+    """Stands in for cloudinary.uploader.upload, failing the first `failures` calls."""
+
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.calls = 0
+
+    def __call__(self, path, **options):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise RuntimeError("Cloudinary unavailable")
+        return {"secure_url": "https://res.cloudinary.com/kamaru/image/upload/v1/photo.jpg", "width": 800, "height": 600}
+
+@pytest.fixture
+def spooled_job(app, tmp_path, monkeypatch):
+    monkeypatch.setattr(upload_queue, "BACKOFF_SECONDS", 0)
+
+    def create(kind="gallery", target_id=None):
+        path = tmp_path / f"{kind}-{target_id}.jpg"
+        path.write_bytes(b"image")
+        with app.app_context():
+            job = UploadJob(kind=kind, target_id=target_id, payload={"title": "Finish line"}, file_path=str(path))
+            db.session.add(job)
+            db.session.commit()
+            return job.id, path
+    return create
+
+def finished_job(app, job_id):
+    with app.app_context():
+        return db.session.get(UploadJob, job_id).to_dict()
+
+def test_upload_succeeds_after_retries_and_removes_the_spool_file(app, spooled_job):
+    app.config["UPLOADER"] = StubUploader(failures=2)
+    job_id, path = spooled_job()
+
+    upload_queue.run_upload_job(app, job_id)
+
+    job = finished_job(app, job_id)
+    assert (job["status"], job["attempts"], job["error"]) == ("done", 3, None)
+    assert not os.path.exists(path)
+    with app.app_context():
+        assert db.session.get(Gallery, job["target_id"]).title == "Finish line"
+
+def test_upload_fails_after_max_attempts_and_removes_the_spool_file(app, spooled_job):
+    app.config["UPLOADER"] = StubUploader(failures=upload_queue.MAX_ATTEMPTS)
+    job_id, path = spooled_job()
+
+    upload_queue.run_upload_job(app, job_id)
+
+    job = finished_job(app, job_id)
+    assert (job["status"], job["attempts"], job["error"]) == ("failed", upload_queue.MAX_ATTEMPTS, "Cloudinary unavailable")
+    assert not os.path.exists(path)
+
+def test_handler_failure_removes_the_spool_file(app, spooled_job):
+    app.config["UPLOADER"] = StubUploader()
+    job_id, path = spooled_job(kind="event", target_id=404)
+
+    upload_queue.run_upload_job(app, job_id)
+
+    job = finished_job(app, job_id)
+    assert (job["status"], job["error"]) == ("failed", "Event 404 no longer exists")
+    assert not os.path.exists(path)
@@ -78,6 +78,39 @@ export const deleteParticipant = (participantId) =>
     },
   });
 
+// Upload jobs API
+// Image uploads finish in the background: the upload call answers 202 with a job,
+// which is polled until Cloudinary has the file and the record is saved
+const UPLOAD_POLL_INTERVAL_MS = 1000;
+const UPLOAD_POLL_TIMEOUT_MS = 5 * 60 * 1000;
+
+export const fetchUploadJob = (jobId) =>
+  api.get(`/uploads/${jobId}`, {
+    headers: {
+      Authorization: `Bearer ${localStorage.getItem("token")}`,
+    },
+  });
+
+// Resolve once the upload job is done, reject if it failed
+const waitForUpload = async (response) => {
+  const job = response.data?.job;
+  if (response.status !== 202 || !job) return response;
+
+  const deadline = Date.now() + UPLOAD_POLL_TIMEOUT_MS;
+  let current = job;
+  while (current.status !== "done") {
+    if (current.status === "failed") {
+      throw new Error(current.error || "Upload failed");
+    }
+    if (Date.now() > deadline) {
+      throw new Error("Upload is still processing; refresh later to see it");
+    }
+    await new Promise((resolve) => setTimeout(resolve, UPLOAD_POLL_INTERVAL_MS));
+    current = (await fetchUploadJob(job.id)).data;
+  }
+  return { ...response, data: { ...response.data, job: current } };
+};
+
 // Gallery API
 export const fetchGalleryImages = () => api.get("/gallery");
 export const uploadImage = (formData) =>
@@ -86,7 +119,7 @@ export const uploadImage = (formData) =>
       Authorization: `Bearer ${localStorage.getItem("token")}`,
       "Content-Type": "multipart/form-data",
     },
-  });
+  }).then(waitForUpload);
 export const deleteImage = (imageId) =>
   api.delete(`/gallery/${imageId}`, {
     headers: {
@@ -101,7 +134,7 @@ export const uploadSystemImage = (formData) =>
       Authorization: `Bearer ${localStorage.getItem("token")}`,
       "Content-Type": "multipart/form-data",
     },
-  });
+  }).then(waitForUpload);
 export const fetchSystemImage = (section) => api.get(`/sys_images/${section}`);
 
 export const deleteSystemImage = (imageId) =>
@@ -118,7 +151,7 @@ export const uploadBanner = (formData) =>
       Authorization: `Bearer ${localStorage.getItem("token")}`,
       "Content-Type": "multipart/form-data",
     },
-  });
+  }).then(waitForUpload);
 
 export const fetchBanners = () => api.get("/sys_images/banners");
 
@@ -153,14 +186,14 @@ export const createEvent = (formData) =>
       Authorization: `Bearer ${localStorage.getItem("token")}`,
       "Content-Type": "multipart/form-data",
     },
-  });
+  }).then(waitForUpload);
 export const updateEvent = (eventId, formData) =>
   api.put(`/events/${eventId}`, formData, {
     headers: {
       Authorization: `Bearer ${localStorage.getItem("token")}`,
       "Content-Type": "multipart/form-data",
     },
-  });
+  }).then(waitForUpload);
 export const deleteEvent = (eventId) =>
   api.delete(`/events/${eventId}`, {
     headers: {